@@ -0,0 +1,208 @@
+"""
+Token authentication with a token → user cache.
+
+DRF's TokenAuthentication runs a Token ⨝ User query on every request.
+CachedTokenAuthentication keeps a snapshot of the user's columns per token
+in a bounded in-process LRU with a TTL, backed by a shared Django cache so
+a cold worker does not hit the database either.
+
+    AUTH_TOKEN_CACHE = {
+        'ENABLED': True,
+        'MAX_SIZE': 10000,     # tokens kept per process
+        'TTL': 30,             # seconds a snapshot is trusted
+        'CACHE_ALIAS': None,   # e.g. 'default'; must be shared by all workers
+    }
+
+Every user has a generation counter in the shared cache, bumped whenever
+the user is saved or deleted. Snapshots remember the generation they were
+taken at, and a local hit is only trusted while it still matches, so
+deactivation, deletion and role changes reach every worker on their next
+request. Deleting a token (rotation) evicts it from the shared tier.
+
+Without a CACHE_ALIAS, invalidation only reaches the current process. That
+is fine for a single process (runserver, tests); with several workers set
+a shared alias or disable the cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.fields.files import FieldFile
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import CustomUser
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,
+    'TTL': 30,
+    'CACHE_ALIAS': None,
+}
+
+# Never cached, and left deferred on snapshot users
+EXCLUDED_FIELDS = ('password',)
+
+
+def get_config(key):
+    return getattr(settings, 'AUTH_TOKEN_CACHE', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Snapshots ─────────────────────────
+
+def snapshot_fields():
+    return [f for f in CustomUser._meta.concrete_fields if f.attname not in EXCLUDED_FIELDS]
+
+
+def take_snapshot(user):
+    values = {}
+    for field in snapshot_fields():
+        value = getattr(user, field.attname)
+        values[field.attname] = value.name if isinstance(value, FieldFile) else value
+    return values
+
+
+def restore_snapshot(values):
+    """A fresh user instance per request; excluded fields load lazily if touched."""
+    names = [f.attname for f in snapshot_fields()]
+    return CustomUser.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+# ───────────────────────── Cache ─────────────────────────
+
+class TokenCache:
+    """Thread-safe LRU of token key → (expires_at, user snapshot, generation)."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def shared(self):
+        alias = get_config('CACHE_ALIAS')
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def shared_key(key):
+        return f'auth-token:{key}'
+
+    @staticmethod
+    def generation_key(user_id):
+        return f'auth-user-generation:{user_id}'
+
+    def generation(self, shared, user_id):
+        return shared.get(self.generation_key(user_id)) if shared else None
+
+    def get(self, key):
+        shared = self.shared()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+            else:
+                entry = None
+
+        if entry:
+            _, values, generation = entry
+            if self.generation(shared, values['id']) == generation:
+                self.hits += 1
+                return values
+            self._discard(key)
+
+        cached = shared.get(self.shared_key(key)) if shared else None
+        if cached is not None:
+            values, generation = cached
+            if self.generation(shared, values['id']) == generation:
+                self._store(key, values, generation)
+                self.hits += 1
+                return values
+        self.misses += 1
+        return None
+
+    def set(self, key, values):
+        shared = self.shared()
+        generation = self.generation(shared, values['id'])
+        if shared:
+            shared.set(self.shared_key(key), (values, generation), get_config('TTL'))
+        self._store(key, values, generation)
+
+    def _store(self, key, values, generation):
+        expires = time.monotonic() + get_config('TTL')
+        with self._lock:
+            self._entries[key] = (expires, values, generation)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(values['id'], set()).add(key)
+            while len(self._entries) > get_config('MAX_SIZE'):
+                old_key, (_, old_values, _) = self._entries.popitem(last=False)
+                self._forget_user_key(old_values['id'], old_key)
+
+    def _discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._forget_user_key(entry[1]['id'], key)
+
+    def _forget_user_key(self, user_id, key):
+        keys = self._keys_by_user.get(user_id)
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def invalidate(self, key):
+        self._discard(key)
+        shared = self.shared()
+        if shared:
+            shared.delete(self.shared_key(key))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+        shared = self.shared()
+        if shared:
+            # Retires every snapshot of this user, in any process
+            self._bump(shared, user_id)
+            # A worker that read the row before this transaction commits may cache it after the bump
+            transaction.on_commit(lambda: self._bump(shared, user_id))
+
+    def _bump(self, shared, user_id):
+        try:
+            shared.incr(self.generation_key(user_id))
+        except ValueError:
+            # Start from the clock so a flushed cache never reissues an old generation
+            shared.set(self.generation_key(user_id), time.time_ns() // 1000, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+
+token_cache = TokenCache()
+
+
+# ───────────────────────── Authentication ─────────────────────────
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the database for recently seen tokens."""
+
+    def authenticate_credentials(self, key):
+        if not get_config('ENABLED'):
+            return super().authenticate_credentials(key)
+        values = token_cache.get(key)
+        if values is not None:
+            user = restore_snapshot(values)
+            return user, Token(key=key, user=user)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, take_snapshot(user))
+        return user, token
@@ -1,9 +1,12 @@
 """
 Email sending utilities for CertTrack authentication and alerts.
+
+Emails are queued as background jobs (see accounts/tasks.py) so no request
+waits on the SMTP server.
 """
 
-from django.core.mail import send_mail
 from django.conf import settings
+from jobs.queue import enqueue
 
 
 FRONTEND_URL = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
@@ -61,8 +64,8 @@ Visit: {FRONTEND_URL}/login
     _send(subject, message, user.email)
 
 
-def send_expiry_alert_email(user, certs):
-    """Send expiry alert email for a list of expiring certificates."""
+def build_expiry_alert_email(user, certs):
+    """Build (subject, message) for an expiry alert about a list of certificates."""
     from datetime import date
     today = date.today()
 
@@ -90,22 +93,27 @@ def send_expiry_alert_email(user, certs):
         f"🔴 ≤7 days  🟡 ≤15 days  🟢 ≤30 days\n\n"
         f"— CertTrack Platform"
     )
+    return subject, message
+
+
+def send_expiry_alert_email(user, certs):
+    """Send expiry alert email for a list of expiring certificates."""
+    subject, message = build_expiry_alert_email(user, certs)
     _send(subject, message, user.email)
 
 
+def from_email():
+    return settings.DEFAULT_FROM_EMAIL or 'noreply@certtrack.app'
+
+
 def _send(subject, message, to_email):
-    """Internal helper — silently skips if no email configured."""
+    """Internal helper — queues the email for the background worker; skips if no address."""
     if not to_email:
         return
     try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL or 'noreply@certtrack.app',
-            [to_email],
-            fail_silently=False,
-        )
+        enqueue('accounts.send_email', subject=subject, message=message,
+                to_email=to_email, from_email=from_email())
     except Exception as e:
         # Log but don't crash the request
         import logging
-        logging.getLogger(__name__).warning(f"Email send failed to {to_email}: {e}")
+        logging.getLogger(__name__).warning(f"Email enqueue failed to {to_email}: {e}")
@@ -0,0 +1,71 @@
+"""
+Management command to compare per-request cost of token authentication.
+
+Creates a throwaway user and token inside a transaction that is rolled back
+at the end, then calls ProfileView in-process with DRF's TokenAuthentication
+and with CachedTokenAuthentication, reporting queries and time per request.
+The cache is enabled for the run even where settings leave it off.
+
+Usage:
+    python manage.py benchmark_auth
+    python manage.py benchmark_auth --requests 5000
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from accounts.authentication import CachedTokenAuthentication, token_cache
+from accounts.models import CustomUser
+from accounts.views import ProfileView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark queries and latency of cached vs uncached token authentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), override_settings(
+                AUTH_TOKEN_CACHE={**settings.AUTH_TOKEN_CACHE, 'ENABLED': True}
+            ):
+                self.run(options['requests'])
+                raise Rollback
+        except Rollback:
+            pass
+        token_cache.clear()
+
+    def run(self, count):
+        user = CustomUser.objects.create(username='__bench_auth__', role='student')
+        token = Token.objects.create(user=user)
+        factory = APIRequestFactory()
+
+        self.stdout.write(f'{"authentication":<28} {"queries/req":>12} {"µs/req":>10}')
+        for auth_class in (TokenAuthentication, CachedTokenAuthentication):
+            view = ProfileView.as_view(authentication_classes=[auth_class])
+            token_cache.clear()
+            # Warm up once so the cached class is measured in its steady state
+            view(factory.get('/api/auth/profile/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(count):
+                    request = factory.get('/api/auth/profile/', HTTP_AUTHORIZATION=f'Token {token.key}')
+                    view(request).render()
+                elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f'{auth_class.__name__:<28} {len(queries) / count:>12.2f} {elapsed / count * 1e6:>10.0f}'
+            )
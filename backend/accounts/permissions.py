@@ -0,0 +1,58 @@
+"""
+Role-based DRF permissions.
+
+    class FacultyStatsView(RolePermissionMixin, APIView):
+        permission_classes = [IsFaculty]
+
+Unauthenticated requests still get a 401. Authenticated users with the
+wrong role get a 403 shaped like the rest of the API,
+``{"error": "Faculty access required."}``, when the view uses
+RolePermissionMixin.
+"""
+
+from rest_framework import permissions
+from rest_framework.exceptions import PermissionDenied
+
+
+class RolePermission(permissions.BasePermission):
+    """Allow authenticated users whose ``role`` is ``self.role`` or one of ``self.roles``."""
+    role = None
+    roles = ()
+
+    def has_permission(self, request, view):
+        user = request.user
+        allowed = self.roles or (self.role,)
+        return bool(user and user.is_authenticated and user.role in allowed)
+
+
+class IsStudent(RolePermission):
+    role = 'student'
+    message = 'Student access required.'
+
+
+class IsFaculty(RolePermission):
+    role = 'faculty'
+    message = 'Faculty access required.'
+
+
+class IsAdmin(RolePermission):
+    role = 'admin'
+    message = 'Admin access required.'
+
+
+class IsFacultyOrAdmin(RolePermission):
+    roles = ('faculty', 'admin')
+    message = 'Faculty or admin access required.'
+
+
+class RolePermissionMixin:
+    """
+    Report permission failures as ``{"error": message}`` like the views always
+    did. A view can set ``permission_message`` to keep its own wording.
+    """
+    permission_message = None
+
+    def permission_denied(self, request, message=None, code=None):
+        if request.authenticators and not request.successful_authenticator:
+            return super().permission_denied(request, message, code)
+        raise PermissionDenied({'error': self.permission_message or message or PermissionDenied.default_detail})
@@ -0,0 +1,12 @@
+"""
+Background tasks for the accounts app.
+"""
+
+from django.core.mail import send_mail
+from jobs.queue import task
+
+
+@task('accounts.send_email')
+def deliver_email(subject, message, to_email, from_email):
+    """Send one email; raising lets the job queue retry it."""
+    send_mail(subject, message, from_email, [to_email], fail_silently=False)
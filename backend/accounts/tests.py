@@ -1,3 +1,117 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .authentication import token_cache
+from .models import CustomUser
+
+
+@override_settings(AUTH_TOKEN_CACHE={'CACHE_ALIAS': 'default'})
+class CachedTokenAuthenticationTests(TestCase):
+    """Repeat requests skip the token query; user and token changes evict the cache."""
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(username='admin', password='pass12345', role='admin')
+        self.user = CustomUser.objects.create_user(username='alice', password='pass12345', role='student')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def profile(self, key=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key or self.token.key}')
+        return self.client.get('/api/auth/profile/')
+
+    def test_second_request_skips_auth_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.profile().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.profile()
+        self.assertEqual(response.data['username'], 'alice')
+
+    def test_cached_user_can_still_save(self):
+        self.profile()
+        self.client.put('/api/auth/profile/', {'first_name': 'Alice'}, format='json')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Alice')
+        self.assertTrue(self.user.check_password('pass12345'))
+        self.assertEqual(self.profile().data['first_name'], 'Alice')
+
+    def test_deactivated_user_is_rejected(self):
+        self.profile()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.profile()
+        admin = APIClient()
+        admin.force_authenticate(self.admin)
+        admin.delete(f'/api/auth/users/{self.user.pk}/')
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_rotated_token_is_rejected(self):
+        self.profile()
+        old_key = self.token.key
+        self.token.delete()
+        new = Token.objects.create(user=self.user)
+        self.assertEqual(self.profile(old_key).status_code, 401)
+        self.assertEqual(self.profile(new.key).status_code, 200)
+
+    def keep_stale_snapshots(self):
+        """Put back this process's entries, as another worker would still hold them."""
+        stale = dict(token_cache._entries)
+        return lambda: token_cache._entries.update(stale)
+
+    def test_other_workers_drop_deactivated_user(self):
+        self.profile()
+        restore = self.keep_stale_snapshots()
+        self.user.is_active = False
+        self.user.save()
+        restore()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_other_workers_see_role_change(self):
+        self.profile()
+        restore = self.keep_stale_snapshots()
+        self.user.role = 'faculty'
+        self.user.save()
+        restore()
+        self.assertEqual(self.profile().data['role'], 'faculty')
+
+    @override_settings(AUTH_TOKEN_CACHE={'CACHE_ALIAS': None})
+    def test_stale_snapshot_is_never_saved(self):
+        self.profile()
+        restore = self.keep_stale_snapshots()
+        self.user.is_active = False
+        self.user.save()
+        restore()
+        response = self.client.put('/api/auth/profile/', {'first_name': 'Alice'}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.first_name, '')
+
+    @override_settings(AUTH_TOKEN_CACHE={'CACHE_ALIAS': None})
+    def test_stale_snapshot_of_deleted_user_cannot_save(self):
+        self.profile()
+        restore = self.keep_stale_snapshots()
+        CustomUser.objects.filter(pk=self.user.pk).delete()
+        restore()
+        response = self.client.put('/api/auth/profile/', {'first_name': 'Alice'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(AUTH_TOKEN_CACHE={'ENABLED': False})
+    def test_disabled_cache_queries_every_time(self):
+        self.profile()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.profile().status_code, 200)
+
+    @override_settings(AUTH_TOKEN_CACHE={'CACHE_ALIAS': None, 'MAX_SIZE': 1})
+    def test_lru_is_bounded(self):
+        other = Token.objects.create(user=self.admin)
+        self.profile()
+        self.profile(other.key)
+        with self.assertNumQueries(1):
+            self.profile()
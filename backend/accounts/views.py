@@ -1,8 +1,9 @@
-from rest_framework import status, permissions
+from rest_framework import exceptions, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 from .models import CustomUser
+from .permissions import IsAdmin, RolePermissionMixin
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, AdminUserSerializer
 
 
@@ -58,7 +59,12 @@ class ProfileView(APIView):
         return Response(UserSerializer(request.user).data)
 
     def put(self, request):
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        # Never save request.user: it may be a cached snapshot, and saving it
+        # would write back stale columns such as is_active or role
+        user = CustomUser.objects.filter(pk=request.user.pk, is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -67,19 +73,15 @@ class ProfileView(APIView):
 
 # ──────────────────────────── Admin Users ────────────────────────────
 
-class AdminUserListView(APIView):
+class AdminUserListView(RolePermissionMixin, APIView):
     """Admin-only: List all users or delete a user."""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [IsAdmin]
 
     def get(self, request):
-        if request.user.role != 'admin':
-            return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
         users = CustomUser.objects.all().order_by('-date_joined')
         return Response(AdminUserSerializer(users, many=True).data)
 
     def delete(self, request, pk=None):
-        if request.user.role != 'admin':
-            return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
         try:
             user = CustomUser.objects.get(pk=pk)
             user.delete()
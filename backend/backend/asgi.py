@@ -2,6 +2,15 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Production runs it as the separate ``events`` process (see Procfile) for the
+certificate event stream only, so SSE connections stay open without tying up
+a worker each. Point CERTIFICATE_EVENTS['STREAM_URL'] at it, or route
+/api/certificates/events/ to it at the proxy.
+
+The rest of the API stays on backend.wsgi. Under ASGI, Django reads sync
+streaming iterators (CSV/NDJSON exports, file downloads) fully into memory
+and spools request bodies before the view runs, so uploads could not be
+rejected early.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -0,0 +1,223 @@
+"""
+Negotiated response compression: brotli when the client and server both
+support it, gzip otherwise.
+
+Replaces Django's GZipMiddleware for the API. Certificate lists shrink
+about sevenfold with gzip, since every row repeats the same keys,
+organizations and URL prefixes. What gets compressed:
+
+- only allowlisted text types (JSON, CSV, NDJSON, plain text). PDFs and
+  images are compressed already, and HTML is left alone because admin pages
+  carry CSRF tokens (BREACH);
+- buffered responses of at least ``MIN_SIZE`` bytes, and only when the
+  result is actually smaller;
+- streaming responses (exports) incrementally. Output is flushed once
+  ``FLUSH_SIZE`` bytes of input have built up, so the client receives rows
+  in steady batches and memory stays flat. Flushing every row would cost
+  ratio and CPU, since exports yield one row per chunk;
+- never ``text/event-stream``, 206 partial content or anything that already
+  has a ``Content-Encoding``.
+
+    RESPONSE_COMPRESSION = {
+        'ENABLED': True,
+        'MIN_SIZE': 1024,       # bytes; smaller bodies are sent as they are
+        'GZIP_LEVEL': 6,
+        'BROTLI_QUALITY': 5,    # 0-11; above ~6 costs more CPU than it saves bytes
+        'STREAMING': True,      # compress streaming responses too
+        'FLUSH_SIZE': 32768,    # bytes of streamed input between flushes
+    }
+
+Brotli needs the optional ``brotli`` package; without it only gzip is
+offered. Strong ETags are weakened on compressed responses, as
+GZipMiddleware does, since the bytes differ per encoding. The middleware
+runs natively under both WSGI and ASGI.
+"""
+
+import gzip
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:   # optional dependency
+    brotli = None
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'STREAMING': True,
+    'FLUSH_SIZE': 32768,
+}
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+
+def get_config(key):
+    return getattr(settings, 'RESPONSE_COMPRESSION', {}).get(key, DEFAULTS[key])
+
+
+def supported_encodings():
+    """Encodings this server can produce, in order of preference."""
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+# ───────────────────────── Negotiation ─────────────────────────
+
+def _quality(params):
+    for param in params:
+        name, _, value = param.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def negotiate(accept_encoding):
+    """
+    The encoding to use for an ``Accept-Encoding`` header, or None.
+
+    Highest q-value wins; ties go to the server's preference (brotli).
+    """
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if coding:
+            accepted[coding] = _quality(params)
+
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+# ───────────────────────── Compressors ─────────────────────────
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=get_config('BROTLI_QUALITY'))
+    return gzip.compress(data, compresslevel=get_config('GZIP_LEVEL'), mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor, flushed every ``FLUSH_SIZE`` bytes of input so the client can decode what it has."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.flush_size = get_config('FLUSH_SIZE')
+        self._pending = 0
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=get_config('BROTLI_QUALITY'))
+        else:
+            # wbits 31: gzip container rather than a raw zlib stream
+            self._compressor = zlib.compressobj(get_config('GZIP_LEVEL'), zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self._pending += len(data)
+        if self.encoding == 'br':
+            out = self._compressor.process(data)
+        else:
+            out = self._compressor.compress(data)
+        if self._pending < self.flush_size:
+            return out
+        self._pending = 0
+        if self.encoding == 'br':
+            return out + self._compressor.flush()
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+    def sequence(self, chunks):
+        for data in chunks:
+            out = self.chunk(data)
+            if out:
+                yield out
+        yield self.finish()
+
+    async def asequence(self, chunks):
+        async for data in chunks:
+            out = self.chunk(data)
+            if out:
+                yield out
+        yield self.finish()
+
+
+# ───────────────────────── Middleware ─────────────────────────
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding') or response.status_code == 206:
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_config('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        # Varies whether or not this particular response ends up compressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            if not get_config('STREAMING'):
+                return response
+            encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if encoding is None:
+                return response
+            compressor = StreamCompressor(encoding)
+            if response.is_async:
+                response.streaming_content = compressor.asequence(response.streaming_content)
+            else:
+                response.streaming_content = compressor.sequence(response.streaming_content)
+            del response['Content-Length']
+        else:
+            if len(response.content) < get_config('MIN_SIZE'):
+                return response
+            encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if encoding is None:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,337 @@
+"""
+Per-request SQL and latency instrumentation.
+
+RequestMetricsMiddleware puts a permanent ``execute_wrapper`` on every
+database connection that reports to the current request's tracker. The
+tracker lives in a context variable, so it follows async views into the
+threads that run their queries. For each request it counts queries and
+database time, then:
+
+- adds a ``Server-Timing`` header (``db`` and ``app`` durations) that shows
+  up in the browser's network panel;
+- logs one JSON line to the ``backend.instrumentation`` logger when the
+  request crosses a threshold, with the slowest SQL and any statement
+  repeated often enough to look like an N+1 loop;
+- records wall time, DB time and query count in rolling per-route
+  histograms, served to admins at ``/api/metrics/``.
+
+    REQUEST_METRICS = {
+        'ENABLED': False,
+        'SERVER_TIMING': True,
+        'SLOW_REQUEST_MS': 500,     # log requests slower than this
+        'SLOW_QUERY_MS': 100,       # ... or running a query slower than this
+        'MAX_QUERIES': 50,          # ... or more queries than this
+        'DUPLICATE_QUERIES': 5,     # ... or the same statement this many times
+        'WINDOW': 900,              # seconds of history kept per route
+    }
+
+When disabled the middleware raises MiddlewareNotUsed, so Django drops it
+from the chain and requests pay nothing. Histograms are per process; with
+several workers each reports its own share of the traffic.
+"""
+
+import heapq
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin, RolePermissionMixin
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_MS': 100,
+    'MAX_QUERIES': 50,
+    'DUPLICATE_QUERIES': 5,
+    'WINDOW': 900,
+}
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+SLICE_SECONDS = 60
+SLOWEST_KEPT = 3
+SQL_LOG_LENGTH = 500
+
+# Collapse IN (%s, %s, ...) lists so batches of different sizes count as one statement
+PLACEHOLDER_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+
+def get_config(key):
+    return getattr(settings, 'REQUEST_METRICS', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Queries ─────────────────────────
+
+def normalize_sql(sql):
+    return PLACEHOLDER_LIST_RE.sub('(%s, ...)', sql)
+
+
+class QueryTracker:
+    """``execute_wrapper`` callable recording count, time and shape of every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.slowest = []   # min-heap of (seconds, sequence, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.statements[normalize_sql(sql)] += 1
+            entry = (elapsed, self.count, sql)
+            if len(self.slowest) < SLOWEST_KEPT:
+                heapq.heappush(self.slowest, entry)
+            elif elapsed > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def slowest_queries(self):
+        return [
+            {'sql': sql[:SQL_LOG_LENGTH], 'ms': round(elapsed * 1000, 2)}
+            for elapsed, _, sql in sorted(self.slowest, reverse=True)
+        ]
+
+    def duplicates(self, threshold):
+        return [
+            {'sql': sql[:SQL_LOG_LENGTH], 'count': count}
+            for sql, count in self.statements.most_common() if count >= threshold
+        ]
+
+
+_current_tracker = ContextVar('request_metrics_tracker', default=None)
+
+
+def track_current_request(execute, sql, params, many, context):
+    tracker = _current_tracker.get()
+    if tracker is None:
+        return execute(sql, params, many, context)
+    return tracker(execute, sql, params, many, context)
+
+
+def install_tracking(connection, **kwargs):
+    """Also a ``connection_created`` receiver, for connections opened by other threads."""
+    if track_current_request not in connection.execute_wrappers:
+        # First in line: execute_wrapper() blocks pop() their own wrapper off the end
+        connection.execute_wrappers.insert(0, track_current_request)
+
+
+# ───────────────────────── Route histograms ─────────────────────────
+
+def _bucket_index(ms):
+    for i, bound in enumerate(BUCKETS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS)
+
+
+def _new_route_stats():
+    return {'count': 0, 'total_ms': 0.0, 'db_ms': 0.0, 'queries': 0, 'max_ms': 0.0,
+            'errors': 0, 'buckets': [0] * (len(BUCKETS) + 1)}
+
+
+class RouteStats:
+    """Per-route latency histograms over a rolling window of one-minute slices."""
+
+    def __init__(self):
+        self._slices = deque()   # (slice number, {route: stats})
+        self._lock = threading.Lock()
+
+    def _current(self, now):
+        number = int(now // SLICE_SECONDS)
+        if not self._slices or self._slices[-1][0] != number:
+            self._slices.append((number, {}))
+        oldest = number - get_config('WINDOW') // SLICE_SECONDS
+        while self._slices and self._slices[0][0] <= oldest:
+            self._slices.popleft()
+        return self._slices[-1][1]
+
+    def record(self, route, ms, db_ms, queries, error=False, now=None):
+        with self._lock:
+            stats = self._current(time.time() if now is None else now).setdefault(route, _new_route_stats())
+            stats['count'] += 1
+            stats['total_ms'] += ms
+            stats['db_ms'] += db_ms
+            stats['queries'] += queries
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['errors'] += error
+            stats['buckets'][_bucket_index(ms)] += 1
+
+    def snapshot(self, now=None):
+        """Merge the slices still inside the window into one summary per route."""
+        with self._lock:
+            self._current(time.time() if now is None else now)
+            merged = {}
+            for _, routes in self._slices:
+                for route, stats in routes.items():
+                    total = merged.setdefault(route, _new_route_stats())
+                    for key in ('count', 'total_ms', 'db_ms', 'queries', 'errors'):
+                        total[key] += stats[key]
+                    total['max_ms'] = max(total['max_ms'], stats['max_ms'])
+                    total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+        return {route: summarize(stats) for route, stats in sorted(merged.items())}
+
+    def clear(self):
+        with self._lock:
+            self._slices.clear()
+
+
+def _percentile(buckets, count, pct):
+    """Upper bound of the bucket holding the pct-th request (None past the last bound)."""
+    rank = pct / 100 * count
+    seen = 0
+    for bound, n in zip((*BUCKETS, None), buckets):
+        seen += n
+        if seen >= rank:
+            return bound
+    return None
+
+
+def summarize(stats):
+    count = stats['count']
+    return {
+        'count': count,
+        'errors': stats['errors'],
+        'mean_ms': round(stats['total_ms'] / count, 2),
+        'max_ms': round(stats['max_ms'], 2),
+        # Bucket upper bounds; a percentile in the open-ended bucket reports the max
+        'p50_ms': _percentile(stats['buckets'], count, 50) or round(stats['max_ms'], 2),
+        'p95_ms': _percentile(stats['buckets'], count, 95) or round(stats['max_ms'], 2),
+        'mean_db_ms': round(stats['db_ms'] / count, 2),
+        'mean_queries': round(stats['queries'] / count, 2),
+        'histogram': {
+            f'le_{bound}' if bound else 'inf': n
+            for bound, n in zip((*BUCKETS, None), stats['buckets'])
+        },
+    }
+
+
+route_stats = RouteStats()
+
+
+# ───────────────────────── Middleware ─────────────────────────
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    route = match.route if match else '<unmatched>'
+    return f'{request.method} /{route}'
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_config('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        for alias in connections:
+            install_tracking(connections[alias])
+        connection_created.connect(install_tracking, dispatch_uid='request_metrics')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Streaming responses (exports, SSE) are timed up to their first byte
+        tracker = QueryTracker()
+        started = time.perf_counter()
+        with self.track_queries(tracker):
+            response = self.get_response(request)
+        return self.process_response(request, response, tracker, started)
+
+    async def __acall__(self, request):
+        tracker = QueryTracker()
+        started = time.perf_counter()
+        with self.track_queries(tracker):
+            response = await self.get_response(request)
+        return self.process_response(request, response, tracker, started)
+
+    @staticmethod
+    @contextmanager
+    def track_queries(tracker):
+        token = _current_tracker.set(tracker)
+        try:
+            yield
+        finally:
+            _current_tracker.reset(token)
+
+    def process_response(self, request, response, tracker, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = tracker.duration * 1000
+
+        route = route_name(request)
+        route_stats.record(route, total_ms, db_ms, tracker.count, error=response.status_code >= 500)
+
+        if get_config('SERVER_TIMING'):
+            timing = f'db;dur={db_ms:.1f};desc="{tracker.count} queries", app;dur={total_ms:.1f}'
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        self.log_if_notable(request, response, route, tracker, total_ms, db_ms)
+        return response
+
+    def log_if_notable(self, request, response, route, tracker, total_ms, db_ms):
+        duplicates = tracker.duplicates(get_config('DUPLICATE_QUERIES'))
+        slowest = tracker.slowest_queries()
+        reasons = [
+            reason for reason, hit in (
+                ('slow_request', total_ms >= get_config('SLOW_REQUEST_MS')),
+                ('slow_query', bool(slowest) and slowest[0]['ms'] >= get_config('SLOW_QUERY_MS')),
+                ('many_queries', tracker.count > get_config('MAX_QUERIES')),
+                ('duplicate_queries', bool(duplicates)),
+            ) if hit
+        ]
+        if not reasons:
+            return
+        logger.warning(json.dumps({
+            'event': 'request_metrics',
+            'reasons': reasons,
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'queries': tracker.count,
+            'slowest_queries': slowest,
+            'duplicate_queries': duplicates,
+        }))
+
+
+# ───────────────────────── Admin view ─────────────────────────
+
+class RequestMetricsView(RolePermissionMixin, APIView):
+    """Admin views rolling per-route latency histograms for this process."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({
+            'enabled': get_config('ENABLED'),
+            'window_seconds': get_config('WINDOW'),
+            'buckets_ms': BUCKETS,
+            'routes': route_stats.snapshot() if get_config('ENABLED') else {},
+        })
@@ -0,0 +1,56 @@
+"""
+JSON renderer backed by orjson, when it is installed.
+
+The bulk of a large list response's render time is ``json.dumps``. orjson
+encodes the same data several times faster, and straight to UTF-8 bytes.
+Output matches DRF's JSONRenderer with its default settings: compact
+separators, unescaped unicode, U+2028/U+2029 escaped for JavaScript and UTC
+datetimes ending in ``Z``.
+
+One difference remains: orjson writes NaN and infinities as ``null``, where
+DRF's STRICT_JSON raises ValueError. Catching that would mean walking every
+value in Python, which costs most of what orjson saves. The serializers here
+never produce non-finite floats.
+
+    REST_FRAMEWORK = {
+        'DEFAULT_RENDERER_CLASSES': [
+            'backend.renderers.FastJSONRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+    }
+
+Without orjson, or for anything orjson cannot encode (integers wider than
+64 bits, indented output for the browsable API), rendering falls back to
+DRF's own encoder. ``python manage.py benchmark_rendering`` compares the two.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:   # optional dependency
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def orjson_default(obj, _encoder=JSONRenderer.encoder_class()):
+    """Types orjson does not know (Decimal, lazy strings, querysets, ...), the DRF way."""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            body = orjson.dumps(data, default=orjson_default,
+                                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Valid JSON but not valid JavaScript before ES2019; DRF escapes them too
+        return body.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
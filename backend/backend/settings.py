@@ -29,9 +29,12 @@ INSTALLED_APPS = [
     # Local apps
     'accounts',
     'certificates',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'backend.instrumentation.RequestMetricsMiddleware',
+    'backend.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -100,6 +103,16 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Certificate downloads go through /api/certificates/<id>/file/. Set
+# DOWNLOAD_SENDFILE to 'x-accel-redirect' (nginx, with an internal location
+# at DOWNLOAD_ACCEL_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile' (Apache)
+# to let the web server transfer the bytes.
+CERTIFICATE_DOWNLOADS = {
+    'SENDFILE': os.environ.get('DOWNLOAD_SENDFILE') or None,
+    'ACCEL_PREFIX': os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/protected-media/'),
+    'URL_TTL': 3600,
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom user model
@@ -107,16 +120,101 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
 
+# Shared cache. Set REDIS_URL when running more than one web worker so
+# dashboard versions and cached responses are seen by all of them.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Token → user cache used by CachedTokenAuthentication (see
+# accounts/authentication.py). Only safe when CACHE_ALIAS is shared by every
+# worker, since deactivations reach other workers through it.
+AUTH_TOKEN_CACHE = {
+    'ENABLED': bool(REDIS_URL),
+    'MAX_SIZE': 10000,
+    'TTL': int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 30)),
+    'CACHE_ALIAS': 'default',
+}
+
+# ETag / response caching for dashboard endpoints (see certificates/caching.py).
+# Only safe when CACHES is shared by every worker.
+DASHBOARD_CACHE = {
+    'ENABLED': bool(REDIS_URL),
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Live review/assignment events (see certificates/events.py). The stream is
+# served by the separate ASGI 'events' process in the Procfile; the 'postgres'
+# backend uses LISTEN/NOTIFY so events published by the API reach it.
+CERTIFICATE_EVENTS = {
+    'BACKEND': os.environ.get(
+        'EVENTS_BACKEND',
+        'postgres' if DATABASES['default']['ENGINE'].endswith('postgresql') else 'memory',
+    ),
+    'HEARTBEAT': 15,
+    'STREAM_URL': os.environ.get('EVENTS_STREAM_URL') or None,
+}
+
 # CORS settings
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
 CORS_ALLOWED_ORIGINS = [FRONTEND_URL] if not DEBUG else []
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 CORS_ALLOW_CREDENTIALS = True
+
+# Faculty assignment — pending cap per faculty and selection strategy
+# ('least_loaded', 'round_robin' or 'by_organization')
+CERTIFICATE_ASSIGNMENT = {
+    'MAX_PENDING': int(os.environ.get('ASSIGNMENT_MAX_PENDING', 5)),
+    'STRATEGY': os.environ.get('ASSIGNMENT_STRATEGY', 'least_loaded'),
+}
+
+# Background job queue (run with `python manage.py run_worker`)
+JOBS = {
+    'EAGER': os.environ.get('JOBS_EAGER', 'False') == 'True',
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'LOCK_TIMEOUT': 300,   # must exceed the longest task; there is no heartbeat
+}
+
+# Expiry reminders (run with `python manage.py run_scheduler`)
+EXPIRY_ALERTS = {
+    'SEND_HOUR': int(os.environ.get('EXPIRY_ALERT_HOUR', 9)),
+    'BATCH_SIZE': 500,
+    'MAX_SLEEP': 300,
+}
+
+# Per-request SQL/latency instrumentation; admins read /api/metrics/
+REQUEST_METRICS = {
+    'ENABLED': os.environ.get('REQUEST_METRICS', 'False') == 'True',
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': int(os.environ.get('SLOW_REQUEST_MS', 500)),
+    'SLOW_QUERY_MS': int(os.environ.get('SLOW_QUERY_MS', 100)),
+    'MAX_QUERIES': 50,
+    'DUPLICATE_QUERIES': 5,
+    'WINDOW': 900,
+}
+
+# br/gzip for JSON, CSV and NDJSON responses; brotli needs the optional package
+RESPONSE_COMPRESSION = {
+    'ENABLED': os.environ.get('RESPONSE_COMPRESSION', 'True') == 'True',
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'STREAMING': True,
+    'FLUSH_SIZE': 32768,
+}
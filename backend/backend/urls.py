@@ -6,10 +6,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .instrumentation import RequestMetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/certificates/', include('certificates.urls')),
+    path('api/metrics/', RequestMetricsView.as_view(), name='request-metrics'),
 ]
 
 # Serve media files in development
@@ -1,9 +1,29 @@
 from django.contrib import admin
-from .models import Certificate
+from .models import Certificate, FacultyLoad, StoredFile
+from .search import search_certificates
 
 
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ['title', 'student', 'faculty', 'status', 'organization', 'created_at']
     list_filter = ['status', 'organization']
-    search_fields = ['title', 'student__username', 'faculty__username']
+    # Shows the search box; the lookup itself goes through the full-text index
+    search_fields = ['title', 'organization', 'student__username']
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_certificates(queryset, search_term), False
+
+
+@admin.register(FacultyLoad)
+class FacultyLoadAdmin(admin.ModelAdmin):
+    list_display = ['faculty', 'pending', 'last_assigned_at']
+    ordering = ['-pending']
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ['digest', 'name', 'refcount', 'released_at', 'created_at']
+    list_filter = ['refcount']
+    readonly_fields = ['digest', 'name', 'refcount', 'released_at', 'created_at']
@@ -0,0 +1,233 @@
+"""
+Materialized analytics rollup for the admin dashboard.
+
+``AnalyticsCounter`` rows hold per-status, per-organization, per-faculty and
+per-day certificate counts plus user counts per role. Signal handlers in
+``signals.py`` apply +1/-1 deltas as certificates and users change, so
+``AdminAnalyticsView`` reads a handful of counter rows instead of scanning
+the certificates and users tables.
+
+``python manage.py rebuild_analytics`` recomputes the rollup from scratch
+and reports any drift.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .models import AnalyticsCounter, Certificate
+from .stats import STATUSES
+
+
+ROLES = [choice for choice, _ in CustomUser.ROLE_CHOICES]
+
+# Certificate columns that feed the rollup.
+TRACKED_FIELDS = ('status', 'organization', 'faculty_id', 'created_at')
+
+
+# ───────────────────────── Deltas ─────────────────────────
+
+def certificate_keys(values):
+    """Reduce a mapping of certificate column values to its rollup keys."""
+    status = values['status']
+    keys = [
+        ('status', '', status),
+        ('organization', values['organization'], status),
+        ('day', timezone.localdate(values['created_at']).isoformat(), status),
+    ]
+    if values['faculty_id'] is not None:
+        keys.append(('faculty', str(values['faculty_id']), status))
+    return keys
+
+
+def instance_values(cert):
+    return {field: getattr(cert, field) for field in TRACKED_FIELDS}
+
+
+def record_certificate_change(old=None, new=None):
+    """Move the counters from one certificate snapshot to another."""
+    deltas = Counter()
+    for key in old or ():
+        deltas[key] -= 1
+    for key in new or ():
+        deltas[key] += 1
+    apply_deltas(deltas)
+
+
+def record_certificates_created(certs):
+    """Explicit hook for bulk_create, which sends no post_save signals."""
+    deltas = Counter()
+    for cert in certs:
+        for key in certificate_keys(instance_values(cert)):
+            deltas[key] += 1
+    apply_deltas(deltas)
+
+
+def record_user_change(old_role=None, new_role=None):
+    deltas = Counter()
+    if old_role:
+        deltas[('users', old_role, '')] -= 1
+    if new_role:
+        deltas[('users', new_role, '')] += 1
+    apply_deltas(deltas)
+
+
+def apply_deltas(deltas):
+    """
+    Apply {(scope, key, status): delta} in two queries: an insert of any
+    missing counter rows and a single CASE update.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    AnalyticsCounter.objects.bulk_create(
+        [AnalyticsCounter(scope=s, key=k, status=st) for s, k, st in deltas],
+        ignore_conflicts=True,
+    )
+    match = Q()
+    whens = []
+    for (scope, key, status), delta in deltas.items():
+        condition = Q(scope=scope, key=key, status=status)
+        match |= condition
+        whens.append(When(condition, then=Value(delta)))
+    AnalyticsCounter.objects.filter(match).update(
+        count=F('count') + Case(*whens, default=Value(0), output_field=IntegerField())
+    )
+
+
+# ───────────────────────── Rebuild ─────────────────────────
+
+def compute_rollup():
+    """Recompute every counter from the source tables."""
+    certificates = Certificate.objects.order_by()
+    users = CustomUser.objects.all()
+
+    counts = Counter()
+    for row in certificates.values('status').annotate(n=Count('id')):
+        counts[('status', '', row['status'])] = row['n']
+    for row in certificates.values('organization', 'status').annotate(n=Count('id')):
+        counts[('organization', row['organization'], row['status'])] = row['n']
+    for row in (certificates.filter(faculty__isnull=False)
+                .values('faculty_id', 'status').annotate(n=Count('id'))):
+        counts[('faculty', str(row['faculty_id']), row['status'])] = row['n']
+    for row in (certificates.annotate(day=TruncDate('created_at'))
+                .values('day', 'status').annotate(n=Count('id'))):
+        counts[('day', row['day'].isoformat(), row['status'])] += row['n']
+    for row in users.order_by().values('role').annotate(n=Count('id')):
+        counts[('users', row['role'], '')] = row['n']
+    return counts
+
+
+def stored_rollup():
+    return Counter({
+        (scope, key, status): count
+        for scope, key, status, count in AnalyticsCounter.objects.values_list(
+            'scope', 'key', 'status', 'count'
+        ) if count
+    })
+
+
+def find_drift(expected, stored):
+    """Returns {key: (stored, expected)} for every counter that differs."""
+    return {
+        key: (stored.get(key, 0), expected.get(key, 0))
+        for key in set(expected) | set(stored)
+        if stored.get(key, 0) != expected.get(key, 0)
+    }
+
+
+def rebuild_rollup(dry_run=False):
+    """Recompute the rollup, replacing it unless dry_run; returns the drift."""
+    with transaction.atomic():
+        expected = compute_rollup()
+        drift = find_drift(expected, stored_rollup())
+        if drift and not dry_run:
+            AnalyticsCounter.objects.all().delete()
+            AnalyticsCounter.objects.bulk_create(
+                [AnalyticsCounter(scope=s, key=k, status=st, count=n)
+                 for (s, k, st), n in expected.items() if n],
+                batch_size=1000,
+            )
+    return drift
+
+
+# ───────────────────────── Reading ─────────────────────────
+
+def read_analytics(days=None, organizations=False):
+    """
+    Build the admin analytics payload from the rollup. Cost depends on the
+    number of faculty, organizations and days requested, never on the
+    number of certificates.
+    """
+    by_status = dict.fromkeys(STATUSES, 0)
+    by_role = dict.fromkeys(ROLES, 0)
+    for scope, key, status, count in AnalyticsCounter.objects.filter(
+        scope__in=['status', 'users']
+    ).values_list('scope', 'key', 'status', 'count'):
+        if scope == 'status':
+            by_status[status] = count
+        else:
+            by_role[key] = count
+
+    workload = {}
+    for key, status, count in AnalyticsCounter.objects.filter(
+        scope='faculty'
+    ).values_list('key', 'status', 'count'):
+        entry = workload.setdefault(key, {'pending_count': 0, 'total_assigned': 0})
+        entry['total_assigned'] += count
+        if status == 'pending':
+            entry['pending_count'] += count
+
+    faculty_workload = []
+    for faculty in CustomUser.objects.filter(role='faculty').values(
+        'id', 'username', 'first_name', 'last_name'
+    ):
+        counts = workload.get(str(faculty['id']), {'pending_count': 0, 'total_assigned': 0})
+        faculty_workload.append({**faculty, **counts})
+
+    data = {
+        'total_certificates': sum(by_status.values()),
+        'certificates_by_status': by_status,
+        'total_students': by_role['student'],
+        'total_faculty': by_role['faculty'],
+        'faculty_workload': faculty_workload,
+    }
+    if days:
+        data['time_series'] = daily_series(days)
+    if organizations:
+        data['certificates_by_organization'] = organization_breakdown()
+    return data
+
+
+def daily_series(days):
+    """Uploads per day by status for the last ``days`` days, oldest first."""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    series = {
+        (start + timedelta(days=i)).isoformat(): dict.fromkeys(STATUSES, 0)
+        for i in range(days)
+    }
+    for key, status, count in AnalyticsCounter.objects.filter(
+        scope='day', key__gte=start.isoformat()
+    ).values_list('key', 'status', 'count'):
+        if key in series:
+            series[key][status] = count
+    return [
+        {'date': day, 'total': sum(counts.values()), **counts}
+        for day, counts in series.items()
+    ]
+
+
+def organization_breakdown():
+    breakdown = {}
+    for key, status, count in AnalyticsCounter.objects.filter(
+        scope='organization'
+    ).values_list('key', 'status', 'count'):
+        breakdown.setdefault(key, dict.fromkeys(STATUSES, 0))[status] = count
+    return breakdown
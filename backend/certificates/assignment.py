@@ -0,0 +1,196 @@
+"""
+Faculty assignment engine.
+
+Each faculty member has a ``FacultyLoad`` row holding their pending count.
+A slot is claimed with a conditional ``UPDATE … WHERE pending < cap``, so
+two concurrent uploads can never push a faculty member past the cap, and
+picking a reviewer costs one small indexed query instead of an aggregate
+over every assigned certificate.
+
+Configure through settings:
+
+    CERTIFICATE_ASSIGNMENT = {
+        'MAX_PENDING': 5,                # per-faculty pending cap
+        'STRATEGY': 'least_loaded',      # or 'round_robin', 'by_organization'
+    }
+"""
+
+import heapq
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .models import Certificate, FacultyLoad
+
+
+DEFAULTS = {
+    'MAX_PENDING': 5,
+    'STRATEGY': 'least_loaded',
+}
+
+# How many candidates to try per round, and how many rounds to re-read
+# candidates when every claim in a round lost a race.
+CANDIDATE_BATCH = 10
+MAX_ROUNDS = 3
+
+
+def get_config(key):
+    return getattr(settings, 'CERTIFICATE_ASSIGNMENT', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Strategies ─────────────────────────
+
+def _available(cap):
+    return FacultyLoad.objects.filter(
+        pending__lt=cap,
+        faculty__role='faculty',
+        faculty__is_active=True,
+    )
+
+
+def least_loaded(cap, organization=None):
+    """Faculty with the fewest pending certificates first."""
+    return list(
+        _available(cap)
+        .order_by('pending', F('last_assigned_at').asc(nulls_first=True))
+        .values_list('faculty_id', flat=True)[:CANDIDATE_BATCH]
+    )
+
+
+def round_robin(cap, organization=None):
+    """Faculty who were assigned least recently first."""
+    return list(
+        _available(cap)
+        .order_by(F('last_assigned_at').asc(nulls_first=True), 'pending')
+        .values_list('faculty_id', flat=True)[:CANDIDATE_BATCH]
+    )
+
+
+def by_organization(cap, organization=None):
+    """
+    Prefer the faculty member who last reviewed a certificate from the same
+    organization, then fall back to least-loaded.
+    """
+    candidates = least_loaded(cap)
+    if organization:
+        recent = (
+            Certificate.objects
+            .filter(organization=organization, faculty__role='faculty', faculty__is_active=True)
+            .order_by('-created_at')
+            .values_list('faculty_id', flat=True)
+            .first()
+        )
+        if recent is not None:
+            candidates = [recent] + [c for c in candidates if c != recent]
+    return candidates
+
+
+STRATEGIES = {
+    'least_loaded': least_loaded,
+    'round_robin': round_robin,
+    'by_organization': by_organization,
+}
+
+
+# ───────────────────────── Public API ─────────────────────────
+
+def claim_faculty(organization=None):
+    """
+    Reserve a pending slot on an available faculty member and return them,
+    or None if everyone is at the cap. Call inside the transaction that
+    creates the certificate so a failed save also releases the slot.
+    """
+    cap = get_config('MAX_PENDING')
+    strategy = STRATEGIES[get_config('STRATEGY')]
+
+    for _ in range(MAX_ROUNDS):
+        candidates = strategy(cap, organization)
+        if not candidates:
+            return None
+        for faculty_id in candidates:
+            claimed = FacultyLoad.objects.filter(
+                pk=faculty_id, pending__lt=cap
+            ).update(pending=F('pending') + 1, last_assigned_at=timezone.now())
+            if claimed:
+                return CustomUser.objects.get(pk=faculty_id)
+    return None
+
+
+def claim_slots(count):
+    """
+    Reserve up to ``count`` pending slots in one pass for bulk imports,
+    filling the least-loaded faculty first. Returns a list of faculty ids,
+    one per slot; it is shorter than ``count`` when capacity runs out.
+    Must run inside a transaction.
+    """
+    cap = get_config('MAX_PENDING')
+    loads = _available(cap)
+    if connection.features.has_select_for_update_of:
+        loads = loads.select_for_update(of=('self',))
+    elif connection.features.has_select_for_update:
+        loads = loads.select_for_update()
+    heap = list(loads.values_list('pending', 'faculty_id'))
+    heapq.heapify(heap)
+
+    assigned = []
+    while heap and len(assigned) < count:
+        pending, faculty_id = heapq.heappop(heap)
+        assigned.append(faculty_id)
+        if pending + 1 < cap:
+            heapq.heappush(heap, (pending + 1, faculty_id))
+    add_load(Counter(assigned))
+    return assigned
+
+
+def add_load(increments):
+    """Apply {faculty_id: n} increments to the pending counters in one UPDATE."""
+    increments = {pk: n for pk, n in increments.items() if n}
+    if not increments:
+        return
+    FacultyLoad.objects.filter(pk__in=increments).update(
+        pending=F('pending') + Case(
+            *[When(pk=pk, then=Value(n)) for pk, n in increments.items()],
+            default=Value(0), output_field=IntegerField(),
+        ),
+        last_assigned_at=timezone.now(),
+    )
+
+
+def release_faculty(faculty_id, count=1):
+    """Give back pending slots, e.g. after certificates are reviewed."""
+    if faculty_id is None or count <= 0:
+        return
+    FacultyLoad.objects.filter(pk=faculty_id, pending__gt=0).update(
+        pending=Greatest(F('pending') - count, Value(0))
+    )
+
+
+def ensure_faculty_load(user):
+    """Create the load row for a faculty member if it does not exist yet."""
+    if user.role == 'faculty':
+        FacultyLoad.objects.get_or_create(faculty=user)
+
+
+def rebuild_faculty_loads():
+    """Recompute every faculty member's pending count from certificates."""
+    faculty = CustomUser.objects.filter(role='faculty').annotate(
+        pending_count=Count('assigned_certificates', filter=Q(assigned_certificates__status='pending'))
+    ).values_list('id', 'pending_count')
+
+    loads = {load.pk: load for load in FacultyLoad.objects.all()}
+    to_create, to_update = [], []
+    for faculty_id, pending in faculty:
+        load = loads.get(faculty_id)
+        if load is None:
+            to_create.append(FacultyLoad(faculty_id=faculty_id, pending=pending))
+        elif load.pending != pending:
+            load.pending = pending
+            to_update.append(load)
+    FacultyLoad.objects.bulk_create(to_create, ignore_conflicts=True)
+    FacultyLoad.objects.bulk_update(to_update, ['pending'])
+    return len(to_create) + len(to_update)
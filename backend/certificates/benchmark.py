@@ -0,0 +1,332 @@
+"""
+Synthetic data and an in-process benchmark harness for the certificate API.
+
+``seed_certificates`` bulk-creates users and certificates with realistic
+status and expiry mixes, then does what the signal handlers would have
+done: analytics rollup, faculty loads, file references, search index and
+alert schedule.
+
+``run_benchmarks`` drives the DRF views through APIRequestFactory, the same
+way benchmark_export does. For each endpoint it records p50/p95/mean
+latency, queries per request and peak Python memory. Results are plain
+dicts, so they can be dumped as JSON and compared against a saved baseline:
+
+    python manage.py seed_benchmark_data --certificates 100000
+    python manage.py benchmark_api --output baseline.json
+    python manage.py benchmark_api --baseline baseline.json   # fails on regressions
+
+Write endpoints run inside a rolled-back transaction and a throwaway
+MEDIA_ROOT, so a benchmark run leaves the data set as it found it.
+"""
+
+import itertools
+import math
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from .analytics import rebuild_rollup
+from .assignment import get_config as assignment_config, rebuild_faculty_loads
+from .blobs import acquire_files
+from .caching import bump_all
+from .models import Certificate
+from .search import update_search_index
+from .storage import file_digest
+from . import views
+
+
+PREFIX = 'bench'
+
+ORGANIZATIONS = {
+    'AWS': ['Cloud Practitioner', 'Solutions Architect Associate', 'Developer Associate'],
+    'Google': ['Associate Cloud Engineer', 'Data Analytics', 'Professional Data Engineer'],
+    'Microsoft': ['Azure Fundamentals', 'Azure Administrator', 'Power BI Data Analyst'],
+    'Cisco': ['CCNA', 'CyberOps Associate'],
+    'Oracle': ['Java SE 17 Developer', 'OCI Foundations'],
+    'Coursera': ['Machine Learning', 'Deep Learning Specialization', 'Python for Everybody'],
+    'NPTEL': ['Data Structures and Algorithms', 'Cloud Computing', 'Internet of Things'],
+    'Red Hat': ['Certified System Administrator'],
+}
+
+# Status mix of a term in progress: most reviewed, a fifth still waiting. Pending
+# certificates are capped by faculty capacity (MAX_PENDING), the rest reviewed.
+STATUS_WEIGHTS = {'accepted': 65, 'rejected': 15, 'pending': 20}
+
+CHUNK_SIZE = 5000
+
+
+# ───────────────────────── Seeding ─────────────────────────
+
+def _users(role, count, prefix, password):
+    return [
+        CustomUser(
+            username=f'{prefix}_{role}{i}', email=f'{prefix}_{role}{i}@example.com',
+            first_name=role.title(), last_name=str(i), role=role, password=password,
+        )
+        for i in range(count)
+    ]
+
+
+def _dates(rng, today):
+    """Issue and expiry dates: a quarter never expire, some expired, some inside the alert window."""
+    issued = today - timedelta(days=rng.randint(0, 3 * 365))
+    roll = rng.random()
+    if roll < 0.25:
+        return issued, None
+    if roll < 0.35:
+        # Expiring within the 30-day alert window
+        return issued, today + timedelta(days=rng.randint(0, 30))
+    return issued, issued + timedelta(days=rng.choice((365, 730, 1095)))
+
+
+def seed_certificates(students=1000, faculty=50, certificates=10000, seed=0, prefix=PREFIX, log=None):
+    """Create the users and certificates; returns (users, certificates) created."""
+    rng = random.Random(seed)
+    today = date.today()
+    password = make_password(None)
+    log = log or (lambda message: None)
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(
+            _users('student', students, prefix, password)
+            + _users('faculty', faculty, prefix, password)
+            + _users('admin', 1, prefix, password),
+            batch_size=1000,
+        )
+        student_ids = list(CustomUser.objects.filter(username__startswith=f'{prefix}_student').values_list('id', flat=True))
+        faculty_ids = list(CustomUser.objects.filter(username__startswith=f'{prefix}_faculty').values_list('id', flat=True))
+
+        # Every seeded certificate shares one small blob; file serving is not what is measured
+        blob = ContentFile(b'%PDF-1.4 benchmark certificate\n%%EOF\n', name='benchmark.pdf')
+        file_hash = file_digest(blob)
+        file_name = Certificate._meta.get_field('file').storage.save('certificates/benchmark.pdf', blob)
+
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        organizations = list(ORGANIZATIONS)
+        # One entry per free pending slot, leaving every queue one short of the
+        # cap so uploads still find a reviewer
+        open_slots = faculty_ids * max(assignment_config('MAX_PENDING') - 1, 0)
+        rng.shuffle(open_slots)
+        created = 0
+        while created < certificates:
+            batch = []
+            for _ in range(min(CHUNK_SIZE, certificates - created)):
+                organization = rng.choice(organizations)
+                issued, expires = _dates(rng, today)
+                status = rng.choices(statuses, weights)[0]
+                if status == 'pending' and open_slots:
+                    faculty_id = open_slots.pop()
+                else:
+                    if status == 'pending':
+                        status = rng.choice(('accepted', 'rejected'))
+                    faculty_id = rng.choice(faculty_ids) if faculty_ids else None
+                cert = Certificate(
+                    student_id=rng.choice(student_ids),
+                    faculty_id=faculty_id,
+                    title=rng.choice(ORGANIZATIONS[organization]),
+                    organization=organization,
+                    issue_date=issued,
+                    expiry_date=expires,
+                    file=file_name,
+                    file_hash=file_hash,
+                    status=status,
+                    remarks='Certificate image is unreadable.' if status == 'rejected' else '',
+                )
+                cert.schedule_alert()
+                batch.append(cert)
+            batch = Certificate.objects.bulk_create(batch)
+            acquire_files(batch)
+            update_search_index(ids=[cert.pk for cert in batch])
+            created += len(batch)
+            log(f'  {created}/{certificates} certificates')
+
+        # Counters that signals keep in step for single saves
+        rebuild_rollup()
+        rebuild_faculty_loads()
+        bump_all()
+
+    return students + faculty + 1, created
+
+
+def clear_seeded(prefix=PREFIX):
+    """Delete users created by seed_certificates and their certificates."""
+    with transaction.atomic():
+        users = CustomUser.objects.filter(username__startswith=f'{prefix}_')
+        deleted, _ = Certificate.objects.filter(student__in=users).delete()
+        users.delete()
+        rebuild_rollup()
+        rebuild_faculty_loads()
+    return deleted
+
+
+# ───────────────────────── Harness ─────────────────────────
+
+def _busiest(role, related):
+    return (
+        CustomUser.objects.filter(role=role).annotate(n=Count(related))
+        .order_by('-n', 'pk').first()
+    )
+
+
+def benchmark_users():
+    """The admin, and the faculty member and student with the most certificates."""
+    return {
+        'admin': CustomUser.objects.filter(role='admin').order_by('pk').first(),
+        'faculty': _busiest('faculty', 'assigned_certificates'),
+        'student': _busiest('student', 'certificates'),
+    }
+
+
+_uploads = itertools.count(1)
+
+
+def upload_data():
+    return {
+        'title': 'Benchmark upload',
+        'organization': 'AWS',
+        'issue_date': (date.today() - timedelta(days=10)).isoformat(),
+        'expiry_date': (date.today() + timedelta(days=355)).isoformat(),
+        # Distinct content per request, so duplicate detection never rejects it
+        'file': SimpleUploadedFile('cert.pdf', b'%%PDF-1.4 benchmark upload %d' % next(_uploads),
+                                   content_type='application/pdf'),
+    }
+
+
+# name: (method, path, view, role, data)
+ENDPOINTS = {
+    'all': ('get', '/api/certificates/all/', views.AdminAllCertificatesView, 'admin', None),
+    'assigned': ('get', '/api/certificates/assigned/', views.FacultyAssignedView, 'faculty', None),
+    'analytics': ('get', '/api/certificates/analytics/', views.AdminAnalyticsView, 'admin', None),
+    'upload': ('post', '/api/certificates/upload/', views.CertificateUploadView, 'student', upload_data),
+    'my': ('get', '/api/certificates/my/', views.StudentCertificateListView, 'student', None),
+    'search': ('get', '/api/certificates/search/', views.CertificateSearchView, 'admin',
+               lambda: {'q': 'cloud'}),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def _call(factory, view, method, path, user, data):
+    if method == 'get':
+        request = factory.get(path, data or {})
+    else:
+        request = factory.post(path, data or {}, format='multipart')
+    force_authenticate(request, user=user)
+
+    def run():
+        response = view(request)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} {path} returned {response.status_code}')
+        return response
+
+    if method == 'get':
+        return run()
+    # Leave the data set untouched; on_commit hooks are dropped with the rollback
+    try:
+        with transaction.atomic():
+            response = run()
+            raise Rollback
+    except Rollback:
+        return response
+
+
+def measure(name, iterations=20, users=None):
+    method, path, view_class, role, make_data = ENDPOINTS[name]
+    users = users or benchmark_users()
+    user = users[role]
+    if user is None:
+        raise LookupError(f"No {role} user to benchmark '{name}' with; seed data first.")
+    view = view_class.as_view()
+    factory = APIRequestFactory()
+    data = make_data or (lambda: None)
+
+    # Warm up caches and lazy imports, then time without instrumentation
+    _call(factory, view, method, path, user, data())
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        _call(factory, view, method, path, user, data())
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # One instrumented request for query count and memory
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        response = _call(factory, view, method, path, user, data())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'method': method.upper(),
+        'path': path,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': len(queries),
+        'peak_kib': round(peak / 1024, 1),
+        'response_bytes': len(getattr(response, 'content', b'')),
+    }
+
+
+def run_benchmarks(names=None, iterations=20):
+    """Benchmark the named endpoints (all by default); returns a JSON-ready dict."""
+    names = names or list(ENDPOINTS)
+    media_root = tempfile.mkdtemp(prefix='certtrack-bench-')
+    try:
+        # Measure the views themselves, not the dashboard response cache
+        with override_settings(MEDIA_ROOT=media_root, DASHBOARD_CACHE={'ENABLED': False}):
+            users = benchmark_users()
+            results = {name: measure(name, iterations, users) for name in names}
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'certificates': Certificate.objects.count(),
+            'users': CustomUser.objects.count(),
+        },
+        'endpoints': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Regressions against a baseline result: p95 slower by more than
+    ``tolerance`` (a fraction), or more queries per request.
+    """
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms → {current['p95_ms']}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} → {current['queries']}")
+    return regressions
@@ -0,0 +1,159 @@
+"""
+Reference counting for content-addressed certificate files.
+
+Each distinct file has a ``StoredFile`` row whose refcount tracks how many
+certificates point at it. Releasing the last reference does not delete the
+blob straight away: ``gc_certificate_files`` removes unreferenced blobs
+after a grace period.
+
+An upload that reuses an existing blob only takes its reference in
+post_save, so the storage first calls ``pin_file``. That restarts the grace
+period, and its UPDATE waits on the row lock of a collection in progress
+(the storage then finds the file gone and writes it again). Collection
+re-checks each row under its lock right before deleting.
+
+Blob files without any row, written by uploads whose transaction rolled
+back, are swept once their mtime is older than the grace period.
+"""
+
+import os
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import StoredFile
+from .previews import delete_previews
+
+
+BLOB_DIR = 'certificates'
+PREVIEW_DIR = 'previews'
+BLOB_NAME_RE = re.compile(r'^(?P<digest>[0-9a-f]{64})(\.\w+)?$|\.part$')
+ORPHAN_CHUNK = 500
+
+
+def acquire_files(certs):
+    """Add one reference per certificate to its stored file."""
+    refs = Counter()
+    names = {}
+    for cert in certs:
+        if cert.file_hash:
+            refs[cert.file_hash] += 1
+            names[cert.file_hash] = cert.file.name
+    if not refs:
+        return
+
+    StoredFile.objects.bulk_create(
+        [StoredFile(digest=digest, name=names[digest]) for digest in refs],
+        ignore_conflicts=True,
+    )
+    StoredFile.objects.filter(digest__in=refs).update(
+        refcount=F('refcount') + Case(
+            *[When(digest=digest, then=Value(n)) for digest, n in refs.items()],
+            default=Value(0), output_field=IntegerField(),
+        ),
+        released_at=None,
+    )
+
+
+def release_file(digest):
+    """Drop one reference; the blob becomes collectable at zero."""
+    if not digest:
+        return
+    StoredFile.objects.filter(digest=digest, refcount__gt=0).update(refcount=F('refcount') - 1)
+    StoredFile.objects.filter(digest=digest, refcount=0, released_at__isnull=True).update(
+        released_at=timezone.now()
+    )
+
+
+def pin_file(digest):
+    """Restart the grace period of an unreferenced blob about to be reused."""
+    StoredFile.objects.filter(digest=digest, refcount=0).update(released_at=timezone.now())
+
+
+def collect_garbage(storage, grace=timedelta(hours=1), dry_run=False):
+    """
+    Delete blobs unreferenced for longer than ``grace``, then orphaned blob
+    files with no StoredFile row. Returns their names.
+    """
+    cutoff = timezone.now() - grace
+    candidates = list(
+        StoredFile.objects.filter(refcount=0, released_at__lt=cutoff).values_list('digest', flat=True)
+    )
+    removed = []
+    for digest in candidates:
+        with transaction.atomic():
+            # Re-check under the row lock: the blob may have been re-referenced or pinned since
+            stored = (
+                StoredFile.objects.select_for_update()
+                .filter(digest=digest, refcount=0, released_at__lt=cutoff).first()
+            )
+            if stored is None:
+                continue
+            removed.append(stored.name)
+            if not dry_run:
+                storage.delete(stored.name)
+                delete_previews(digest)
+                stored.delete()
+    return removed + collect_orphans(storage, cutoff, dry_run)
+
+
+def _stale_blob_files(storage, cutoff):
+    """(path, digest or None) of blob and temp files last touched before ``cutoff``."""
+    root = storage.path(BLOB_DIR)
+    for directory, subdirs, files in os.walk(root):
+        if directory == root:
+            subdirs[:] = [d for d in subdirs if d != PREVIEW_DIR]
+        for file_name in files:
+            match = BLOB_NAME_RE.search(file_name)
+            if not match:
+                continue   # not written by ContentAddressedStorage (e.g. legacy names)
+            path = os.path.join(directory, file_name)
+            try:
+                if os.stat(path).st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            yield path, match['digest']
+
+
+def _delete_if_stale(path, cutoff):
+    """
+    Move the file aside before deleting it: if an upload touched it after
+    the scan, the moved file shows the new mtime and is put back.
+    """
+    trash = f'{path}.gc'
+    try:
+        os.replace(path, trash)
+    except FileNotFoundError:
+        return False
+    if os.stat(trash).st_mtime >= cutoff:
+        os.replace(trash, path)
+        return False
+    os.remove(trash)
+    return True
+
+
+def collect_orphans(storage, cutoff, dry_run=False):
+    """Delete blob files no StoredFile row refers to, left by rolled-back uploads."""
+    stale = list(_stale_blob_files(storage, cutoff.timestamp()))
+    digests = list({digest for _, digest in stale if digest})
+    known = set()
+    for start in range(0, len(digests), ORPHAN_CHUNK):
+        known.update(
+            StoredFile.objects.filter(digest__in=digests[start:start + ORPHAN_CHUNK])
+            .values_list('digest', flat=True)
+        )
+
+    removed = []
+    for path, digest in stale:
+        if digest in known:
+            continue
+        if dry_run or _delete_if_stale(path, cutoff.timestamp()):
+            removed.append(os.path.relpath(path, storage.location).replace(os.sep, '/'))
+            if digest and not dry_run:
+                delete_previews(digest)
+    return removed
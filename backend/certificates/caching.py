@@ -0,0 +1,138 @@
+"""
+Conditional GET and response caching for the dashboard endpoints.
+
+Every user has a version counter in the Django cache, bumped (on commit)
+whenever a certificate they are the student or faculty of is created,
+changed or deleted. Dashboard GETs derive their ETag from:
+
+- that version;
+- a global version, bumped when any user changes, because names appear in
+  other users' lists;
+- today's date, since expiry alerts move with the calendar;
+- the current signed-link window, see downloads.py.
+
+An ``If-None-Match`` hit returns 304 before the view runs a single query.
+Otherwise the response data is cached under the ETag and request path, so
+a poll from a second tab or device is served from the cache as well.
+
+    DASHBOARD_CACHE = {
+        'ENABLED': True,
+        'CACHE_ALIAS': 'default',   # must be shared by all workers, e.g. Redis
+        'TIMEOUT': 300,             # seconds a cached response is kept
+    }
+
+Versions must be visible to every worker. With a per-process cache such
+as LocMemCache and several workers, keep this disabled.
+"""
+
+import hashlib
+import time
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import downloads
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+GLOBAL = 'all'
+
+
+def get_config(key):
+    return getattr(settings, 'DASHBOARD_CACHE', {}).get(key, DEFAULTS[key])
+
+
+def get_cache():
+    return caches[get_config('CACHE_ALIAS')]
+
+
+def version_key(owner):
+    return f'dashboard-version:{owner}'
+
+
+# ───────────────────────── Versions ─────────────────────────
+
+def _bump(owners):
+    cache = get_cache()
+    for owner in owners:
+        try:
+            cache.incr(version_key(owner))
+        except ValueError:
+            # Start from the clock so a flushed cache never reissues an old ETag
+            cache.set(version_key(owner), time.time_ns() // 1000, None)
+
+
+def bump_versions(user_ids):
+    """Invalidate the dashboards of these users once the transaction commits."""
+    owners = {pk for pk in user_ids if pk is not None}
+    if owners and get_config('ENABLED'):
+        transaction.on_commit(lambda: _bump(owners))
+
+
+def bump_all():
+    if get_config('ENABLED'):
+        transaction.on_commit(lambda: _bump([GLOBAL]))
+
+
+def dashboard_etag(user):
+    versions = get_cache().get_many([version_key(user.pk), version_key(GLOBAL)])
+    window = int(time.time()) // downloads.get_config('URL_TTL')
+    parts = (
+        user.pk,
+        versions.get(version_key(user.pk), 0),
+        versions.get(version_key(GLOBAL), 0),
+        date.today().isoformat(),
+        window,
+    )
+    digest = hashlib.sha1(':'.join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+# ───────────────────────── Views ─────────────────────────
+
+def _finish(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def dashboard_cache(method):
+    """
+    Decorate a dashboard ``get(self, request)``: answer ``If-None-Match``
+    with 304 and serve repeat requests from the response cache.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not get_config('ENABLED'):
+            return method(self, request, *args, **kwargs)
+
+        etag = dashboard_etag(request.user)
+        # Weak comparison: compressed responses carry W/ versions of the tag
+        if etag in {tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))}:
+            return _finish(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        cache = get_cache()
+        key = f'dashboard:{etag}:{request.get_full_path()}'
+        data = cache.get(key)
+        if data is not None:
+            return _finish(Response(data), etag)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, get_config('TIMEOUT'))
+            _finish(response, etag)
+        return response
+    return wrapper
@@ -0,0 +1,158 @@
+"""
+Batched, parallel email delivery for bulk alert runs.
+
+Messages are grouped into batches; each worker thread opens one mail
+connection per batch and sends the whole batch over it, instead of one
+SMTP connection per message. A shared rate limiter caps messages per
+second, and the unsent rest of a failed batch is retried with exponential
+backoff.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.core.mail import EmailMessage, get_connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces sends out to at most ``rate`` messages per second (0 = unlimited)."""
+
+    def __init__(self, rate=0):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_at = time.monotonic()
+
+    def wait(self, count=1):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + count * self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+@dataclass
+class DeliveryReport:
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def throughput(self):
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+
+class BatchMailer:
+    """
+    Queue (subject, message, to_email) items and deliver them in batches on
+    a worker pool. At most ``2 * workers`` batches are in flight, so a
+    streaming producer never buffers the whole run in memory.
+
+    Each item may carry a ``tag``; once a batch is delivered,
+    ``on_delivered(tags)`` is called on the producer's thread, so callers
+    can record progress with their own database connection.
+
+        with BatchMailer(batch_size=100, workers=4) as mailer:
+            mailer.add(subject, message, user.email)
+        print(mailer.report.sent)
+    """
+
+    def __init__(self, from_email, batch_size=100, workers=4, rate=0, retries=3, backoff=1.0,
+                 on_delivered=None):
+        self.from_email = from_email
+        self.on_delivered = on_delivered
+        self.batch_size = max(1, batch_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(rate)
+        self.report = DeliveryReport()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._max_in_flight = 2 * max(1, workers)
+        self._futures = deque()
+        self._started = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, subject, message, to_email, tag=None):
+        self._pending.append((subject, message, to_email, tag))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Record progress of batches that already finished
+        while self._futures and self._futures[0].done():
+            self._complete(self._futures.popleft())
+        if self._pending:
+            while len(self._futures) >= self._max_in_flight:
+                self._complete(self._futures.popleft())
+            batch, self._pending = self._pending, []
+            self._futures.append(self._pool.submit(self._deliver, batch))
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+        while self._futures:
+            self._complete(self._futures.popleft())
+        self.report.elapsed = time.monotonic() - self._started
+
+    def _complete(self, future):
+        tags = future.result()
+        if tags and self.on_delivered:
+            self.on_delivered(tags)
+
+    def _deliver(self, batch):
+        """
+        Send one batch; returns the tags of the delivered items.
+
+        Messages go out one at a time over the batch's connection, so a
+        failure partway through retries only what was not sent yet.
+        """
+        remaining = [
+            (EmailMessage(subject, message, self.from_email, [to_email]), tag)
+            for subject, message, to_email, tag in batch
+        ]
+        delivered = []
+        for attempt in range(self.retries + 1):
+            try:
+                self.limiter.wait(len(remaining))
+                with get_connection(fail_silently=False) as connection:
+                    while remaining:
+                        message, tag = remaining[0]
+                        if not connection.send_messages([message]):
+                            raise RuntimeError(f'Email to {message.to[0]} was not accepted')
+                        delivered.append(tag)
+                        remaining.pop(0)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.warning(f"{len(remaining)} of {len(batch)} email(s) in a batch failed: {e}")
+                    with self._lock:
+                        self.report.failed += len(remaining)
+                        self.report.errors.append(str(e))
+                    break
+                with self._lock:
+                    self.report.retries += 1
+                time.sleep(self.backoff * (2 ** attempt))
+
+        with self._lock:
+            self.report.sent += len(delivered)
+            self.report.batches += 1
+        return [tag for tag in delivered if tag is not None]
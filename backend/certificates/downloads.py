@@ -0,0 +1,195 @@
+"""
+Permission-checked downloads of certificate files and their previews.
+
+Certificate files are never served from MEDIA_URL in production. Clients
+get links to ``/api/certificates/<id>/file/`` instead, signed so a browser
+can open them without the API token:
+
+    /api/certificates/42/file/?rendition=thumbnail&expires=1760000000&signature=…
+
+Expiry is rounded up to a whole ``URL_TTL`` window, so the same link is
+handed out for a while and browsers can reuse their cached copy.
+
+The transfer itself is handed to the web server when configured:
+
+    CERTIFICATE_DOWNLOADS = {
+        'SENDFILE': 'x-accel-redirect',       # nginx; or 'x-sendfile' (Apache/lighttpd), or None
+        'ACCEL_PREFIX': '/protected-media/',  # internal nginx location aliased to MEDIA_ROOT
+        'URL_TTL': 3600,                      # seconds a signed link stays valid
+    }
+
+Without a sendfile backend, Django streams the file itself with ETag,
+If-None-Match and single-range Range support.
+"""
+
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.signing import Signer
+from django.http import FileResponse, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+
+
+DEFAULTS = {
+    'SENDFILE': None,
+    'ACCEL_PREFIX': '/protected-media/',
+    'URL_TTL': 3600,
+}
+
+RENDITIONS = ('file', 'thumbnail', 'preview')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_signer = Signer(salt='certificates.downloads')
+
+
+def get_config(key):
+    return getattr(settings, 'CERTIFICATE_DOWNLOADS', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Links ─────────────────────────
+
+def _signature(pk, rendition, expires):
+    return _signer.signature(f'{pk}:{rendition}:{expires}')
+
+
+def download_url(cert, rendition='file', request=None):
+    """Signed download link for one of the certificate's files, or None if it is empty."""
+    if not getattr(cert, rendition):
+        return None
+    return url_builder(request)(cert.pk, rendition)
+
+
+def url_builder(request=None):
+    """
+    ``build(pk, rendition)`` returning signed links. The route and expiry are
+    resolved once, so list endpoints can sign thousands of links cheaply.
+    """
+    ttl = get_config('URL_TTL')
+    # Round up to the end of the next window so the link stays stable for at least ttl
+    expires = (int(time.time()) // ttl + 2) * ttl
+    placeholder = '999999999'
+    path = reverse('cert-file', args=[placeholder])
+    if request:
+        path = request.build_absolute_uri(path)
+    before, after = path.split(placeholder, 1)
+
+    def build(pk, rendition='file'):
+        query = f'expires={expires}&signature={_signature(pk, rendition, expires)}'
+        if rendition != 'file':
+            query = f'rendition={rendition}&{query}'
+        return f'{before}{pk}{after}?{query}'
+    return build
+
+
+def has_valid_signature(params, pk, rendition):
+    expires = params.get('expires', '')
+    signature = params.get('signature', '')
+    if not (expires.isdigit() and signature) or int(expires) < time.time():
+        return False
+    return constant_time_compare(signature, _signature(pk, rendition, int(expires)))
+
+
+# ───────────────────────── Responses ─────────────────────────
+
+def file_etag(cert, rendition):
+    if cert.file_hash:
+        return f'"{cert.file_hash}-{rendition}"'
+    field = getattr(cert, rendition)
+    stat = os.stat(field.path)
+    return f'"{int(stat.st_mtime)}-{stat.st_size}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) for a single ``bytes=`` range, None to send the whole file,
+    or False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+class RangeFile:
+    """Iterate over ``length`` bytes of an open file, in FileResponse-sized blocks."""
+
+    def __init__(self, fileobj, start, length, block_size=FileResponse.block_size):
+        self.fileobj = fileobj
+        self.remaining = length
+        self.block_size = block_size
+        fileobj.seek(start)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.fileobj.read(min(self.block_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.fileobj.close()
+
+
+def serve_certificate_file(request, cert, rendition='file'):
+    field = getattr(cert, rendition)
+    etag = file_etag(cert, rendition)
+    content_type = mimetypes.guess_type(field.name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _file_response(request, field, etag)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=3600'
+    if response.status_code != 304:
+        response['Content-Type'] = content_type
+        response['Content-Disposition'] = f'inline; filename="{os.path.basename(field.name)}"'
+    return response
+
+
+def _file_response(request, field, etag):
+    sendfile = get_config('SENDFILE')
+    if sendfile == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = get_config('ACCEL_PREFIX').rstrip('/') + '/' + field.name
+        return response
+    if sendfile == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = field.path
+        return response
+
+    size = field.size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or if_range == etag:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    fileobj = field.storage.open(field.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(fileobj)
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeFile(fileobj, start, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,232 @@
+"""
+Server-sent events for certificate review and assignment.
+
+Views publish small events to the users they affect once the transaction
+commits:
+
+    publish_event([cert.student_id], 'certificate.reviewed', certificate=cert.pk, status='accepted')
+
+``/api/certificates/events/`` streams them to the browser as SSE. It is
+served by its own ASGI process (see backend/asgi.py) while the rest of the
+API runs under WSGI. Dashboards refetch when an event arrives instead of
+polling their lists.
+
+Two brokers are available:
+
+    CERTIFICATE_EVENTS = {
+        'BACKEND': 'memory',     # or 'postgres' for LISTEN/NOTIFY across processes
+        'CHANNEL': 'certificate_events',
+        'HEARTBEAT': 15,         # seconds between keep-alive comments
+        'QUEUE_SIZE': 100,       # buffered events per connection
+        'TICKET_MAX_AGE': 3600,  # seconds a stream ticket is accepted
+        'STREAM_URL': None,      # e.g. 'https://events.example.com', the ASGI process
+    }
+
+The in-memory broker only reaches subscribers in the publishing process, so
+it only works when one process serves both the API and the stream
+(runserver). Otherwise use the PostgreSQL backend: every process LISTENs on
+one channel from a background thread and fans events out to its own
+subscribers.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
+from django.db import connection, connections, transaction
+from django.urls import reverse
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    'CHANNEL': 'certificate_events',
+    'HEARTBEAT': 15,
+    'QUEUE_SIZE': 100,
+    'TICKET_MAX_AGE': 3600,
+    'STREAM_URL': None,
+}
+
+_ticket_signer = TimestampSigner(salt='certificates.events')
+
+
+def get_config(key):
+    return getattr(settings, 'CERTIFICATE_EVENTS', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Tickets ─────────────────────────
+
+def issue_ticket(user):
+    """EventSource cannot send the API token, so the stream URL carries a signed user id."""
+    return _ticket_signer.sign(str(user.pk))
+
+
+def stream_url(request, user):
+    """Absolute stream URL for this user, on STREAM_URL's host when it is set."""
+    path = f"{reverse('cert-events')}?ticket={issue_ticket(user)}"
+    base = get_config('STREAM_URL')
+    return base.rstrip('/') + path if base else request.build_absolute_uri(path)
+
+
+def read_ticket(ticket):
+    """The user id from a valid ticket, or None."""
+    try:
+        return int(_ticket_signer.unsign(ticket or '', max_age=get_config('TICKET_MAX_AGE')))
+    except (BadSignature, SignatureExpired, ValueError):
+        return None
+
+
+# ───────────────────────── Brokers ─────────────────────────
+
+class Subscription:
+    """One SSE connection: an asyncio queue fed from any thread."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=get_config('QUEUE_SIZE'))
+        self.overflowed = False
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client is not keeping up; tell it to refetch once it catches up
+            self.overflowed = True
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout):
+        event = await asyncio.wait_for(self.queue.get(), timeout)
+        if self.overflowed and self.queue.empty():
+            self.overflowed = False
+            return {'type': 'resync'}
+        return event
+
+
+class MemoryBroker:
+    """Fan events out to subscribers in this process."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def dispatch(self, user_ids, event):
+        with self._lock:
+            targets = [s for pk in user_ids for s in self._subscribers.get(pk, ())]
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def publish(self, user_ids, event):
+        self.dispatch(user_ids, event)
+
+
+class PostgresBroker(MemoryBroker):
+    """NOTIFY on publish; a LISTEN thread per process feeds local subscribers."""
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, user_id):
+        self._ensure_listener()
+        return super().subscribe(user_id)
+
+    def publish(self, user_ids, event):
+        payload = json.dumps({'users': sorted(user_ids), 'event': event})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [get_config('CHANNEL'), payload])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='certificate-events', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+
+        while True:
+            try:
+                params = connections['default'].get_connection_params()
+                conn = psycopg2.connect(**params)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{get_config("CHANNEL")}"')
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        self.dispatch(message['users'], message['event'])
+            except Exception:
+                logger.exception('Certificate event listener failed; reconnecting')
+                threading.Event().wait(5)
+
+
+BROKERS = {
+    'memory': MemoryBroker,
+    'postgres': PostgresBroker,
+}
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = BROKERS[get_config('BACKEND')]()
+    return _broker
+
+
+def publish_event(user_ids, event_type, **data):
+    """Send an event to these users after the current transaction commits."""
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return
+    event = {'type': event_type, **data}
+    transaction.on_commit(lambda: get_broker().publish(user_ids, event))
+
+
+# ───────────────────────── Stream ─────────────────────────
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(user_id):
+    broker = get_broker()
+    subscription = broker.subscribe(user_id)
+    heartbeat = get_config('HEARTBEAT')
+    try:
+        # Clients refetch on 'ready', which also covers anything missed while disconnected
+        yield 'retry: 5000\n\n' + format_event({'type': 'ready'})
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,244 @@
+"""
+Bulk import of historical certificates from a manifest plus their files.
+
+The manifest is CSV (with a header row) or NDJSON, one certificate per row:
+
+    student,title,organization,issue_date,expiry_date,file,status,remarks,faculty
+    alice,AWS Cloud Practitioner,AWS,2023-01-10,2026-01-10,alice/aws.pdf,accepted,,bob
+
+``student`` and ``faculty`` are usernames; ``file`` is a path inside the
+files directory or zip archive. ``status`` defaults to pending, and pending
+rows without a faculty are assigned through the assignment engine in batch.
+
+Rows are validated with the upload rules, then written chunk by chunk with
+``bulk_create`` inside one transaction per chunk. Invalid rows, including
+NDJSON lines that are not a JSON object, are reported with their row
+number and never block the rest of the import. If the manifest becomes
+unreadable partway (bad encoding, broken CSV quoting), the chunks already
+read are still imported and the result carries ``manifest_error``.
+"""
+
+import csv
+import io
+import itertools
+import json
+import os
+import zipfile
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from accounts.models import CustomUser
+from .analytics import record_certificates_created
+from .assignment import add_load, claim_slots
+from .blobs import acquire_files
+from .caching import bump_versions
+from .models import Certificate
+from .search import update_search_index
+from .serializers import CertificateImportSerializer
+from .tasks import queue_previews
+
+
+MAX_REPORTED_ERRORS = 1000
+
+
+# ───────────────────────── Inputs ─────────────────────────
+
+def manifest_format(name):
+    return 'ndjson' if name.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+class ManifestRowError(ValueError):
+    """A manifest row that could not be parsed, yielded in place of the row."""
+
+
+def read_manifest(fileobj, fmt=None):
+    """Yield row dicts (or ManifestRowError) from a binary CSV or NDJSON manifest."""
+    fmt = fmt or manifest_format(getattr(fileobj, 'name', ''))
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for row in csv.DictReader(text):
+            yield {key.strip(): (value or '').strip() for key, value in row.items() if key}
+    else:
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield ManifestRowError(f'Invalid JSON: {e}')
+                continue
+            yield row if isinstance(row, dict) else ManifestRowError('Row must be a JSON object.')
+
+
+class DirectoryFiles:
+    """Certificate files under a local directory."""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+
+    def open(self, name):
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+        return File(open(path, 'rb'), name=os.path.basename(path))
+
+
+class ZipFiles:
+    """Certificate files inside a zip archive."""
+
+    def __init__(self, archive):
+        self.zip = zipfile.ZipFile(archive)
+        self.names = set(self.zip.namelist())
+
+    def open(self, name):
+        if name not in self.names:
+            return None
+        return ContentFile(self.zip.read(name), name=os.path.basename(name))
+
+
+def open_files(path):
+    return ZipFiles(path) if zipfile.is_zipfile(path) else DirectoryFiles(path)
+
+
+# ───────────────────────── Import ─────────────────────────
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    manifest_error: str = ''
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'manifest_error': self.manifest_error or None,
+        }
+
+
+class CertificateImporter:
+    """
+    Import manifest rows in chunks:
+
+        result = CertificateImporter(open_files('certs.zip')).run(read_manifest(fp))
+    """
+
+    def __init__(self, files, chunk_size=1000, allow_expired=True, dry_run=False):
+        self.files = files
+        self.chunk_size = chunk_size
+        self.allow_expired = allow_expired
+        self.dry_run = dry_run
+
+    def run(self, rows):
+        result = ImportResult()
+        chunk = []
+        rows = iter(rows)
+        for number in itertools.count(1):
+            try:
+                row = next(rows)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as e:
+                # Earlier chunks are committed already; keep them and report where reading stopped
+                result.manifest_error = f'Could not read the manifest past row {number - 1}: {e}'
+                break
+            chunk.append((number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk, result)
+        return result
+
+    def import_chunk(self, chunk, result):
+        result.rows += len(chunk)
+        usernames = {
+            row[key] for _, row in chunk if isinstance(row, dict)
+            for key in ('student', 'faculty') if isinstance(row.get(key), str)
+        }
+        users = {
+            user.username: user
+            for user in CustomUser.objects.filter(username__in=usernames).only('id', 'username', 'role')
+        }
+        context = {'users': users, 'allow_expired': self.allow_expired}
+
+        certs, opened = [], []
+        try:
+            for number, row in chunk:
+                if isinstance(row, ManifestRowError):
+                    result.add_error(number, {'manifest': [str(row)]})
+                    continue
+                data = {key: value for key, value in row.items() if value not in (None, '')}
+                file_name = data.pop('file', None)
+                upload = self.files.open(file_name) if file_name else None
+                if upload is None:
+                    result.add_error(number, {'file': [f"File '{file_name}' not found."]})
+                    continue
+                opened.append(upload)
+
+                serializer = CertificateImportSerializer(data={**data, 'file': upload}, context=context)
+                if not serializer.is_valid():
+                    result.add_error(number, serializer.errors)
+                    continue
+                values = serializer.validated_data
+                certs.append((number, Certificate(
+                    student=values['student'],
+                    faculty=values.get('faculty'),
+                    title=values['title'],
+                    organization=values['organization'],
+                    issue_date=values['issue_date'],
+                    expiry_date=values.get('expiry_date'),
+                    file=values['file'],
+                    file_hash=values['file'].sha256,
+                    status=values.get('status', 'pending'),
+                    remarks=values.get('remarks', ''),
+                )))
+
+            if certs and not self.dry_run:
+                with transaction.atomic():
+                    certs = self.assign_pending(certs, result)
+                    for _, cert in certs:
+                        cert.schedule_alert()
+                    created = Certificate.objects.bulk_create([cert for _, cert in certs])
+                    record_certificates_created(created)
+                    acquire_files(created)
+                    queue_previews(created)
+                    update_search_index(ids=[cert.pk for cert in created])
+                    bump_versions({pk for cert in created for pk in (cert.student_id, cert.faculty_id)})
+            result.created += len(certs)
+        finally:
+            for upload in opened:
+                upload.close()
+
+    def assign_pending(self, certs, result):
+        """Assign faculty to pending rows in one batch and bump their counters."""
+        unassigned = [cert for _, cert in certs if cert.status == 'pending' and cert.faculty_id is None]
+        slots = iter(claim_slots(len(unassigned))) if unassigned else iter(())
+        explicit = Counter()
+
+        kept = []
+        for number, cert in certs:
+            if cert.status == 'pending':
+                if cert.faculty_id is None:
+                    cert.faculty_id = next(slots, None)
+                    if cert.faculty_id is None:
+                        result.add_error(number, {'faculty': ['No faculty available currently.']})
+                        continue
+                else:
+                    explicit[cert.faculty_id] += 1
+            kept.append((number, cert))
+        add_load(explicit)
+        return kept
@@ -0,0 +1,59 @@
+"""
+Management command to benchmark the certificate API endpoints in-process.
+
+Runs against whatever is in the database (see seed_benchmark_data) and
+reports p50/p95 latency, queries and peak memory per endpoint.
+
+Usage:
+    python manage.py benchmark_api                                # All endpoints, 20 requests each
+    python manage.py benchmark_api --endpoints all assigned --iterations 50
+    python manage.py benchmark_api --output baseline.json         # Save results as JSON
+    python manage.py benchmark_api --baseline baseline.json       # Exit 1 on regressions
+"""
+
+import json
+from django.core.management.base import BaseCommand, CommandError
+from certificates.benchmark import ENDPOINTS, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Record latency, query count and peak memory of the certificate API endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=None)
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed requests per endpoint (default: 20)')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='Compare against a previous --output file')
+        parser.add_argument('--tolerance', type=float, default=20,
+                            help='Allowed p95 slowdown against the baseline, in percent (default: 20)')
+
+    def handle(self, *args, **options):
+        try:
+            results = run_benchmarks(options['endpoints'], options['iterations'])
+        except (LookupError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        meta = results['meta']
+        self.stdout.write(f"📊 {meta['certificates']} certificate(s), {meta['users']} user(s) on {meta['database']}\n")
+        self.stdout.write(f'{"endpoint":<12} {"p50 ms":>9} {"p95 ms":>9} {"mean ms":>9} {"queries":>8} {"peak KiB":>10}')
+        for name, row in results['endpoints'].items():
+            self.stdout.write(
+                f"{name:<12} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['mean_ms']:>9.2f} "
+                f"{row['queries']:>8} {row['peak_kib']:>10.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"\n💾 Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, options['tolerance'] / 100)
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(f'❌ {line}'))
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS('\n✅ No regressions against the baseline.'))
@@ -0,0 +1,92 @@
+"""
+Management command to measure memory use of the streaming certificate export.
+
+Seeds synthetic certificates inside a transaction that is rolled back at the
+end, then drives AdminExportView in-process for each row count and reports
+bytes written, time taken and peak memory.
+
+Usage:
+    python manage.py benchmark_export                          # 1k, 10k, 100k rows
+    python manage.py benchmark_export --rows 1000 1000000 --output ndjson
+"""
+
+import resource
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser
+from certificates.models import Certificate
+from certificates.views import AdminExportView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark peak memory of the streaming certificate export against row count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--output', choices=['csv', 'ndjson'], default='csv')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(sorted(options['rows']), options['output'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes, output):
+        admin = CustomUser.objects.create(username='__bench_admin__', role='admin')
+        student = CustomUser.objects.create(username='__bench_student__', role='student')
+        view = AdminExportView.as_view()
+        factory = APIRequestFactory()
+
+        self.stdout.write(f'{"rows":>10} {"bytes":>14} {"seconds":>9} {"py peak MiB":>12} {"max RSS MiB":>12}')
+        seeded = 0
+        for size in sizes:
+            self.seed(student, seeded, size)
+            seeded = size
+
+            request = factory.get('/api/certificates/export/', {'output': output})
+            force_authenticate(request, user=admin)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = view(request)
+            written = sum(len(chunk) for chunk in response.streaming_content)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # ru_maxrss is KiB on Linux
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            self.stdout.write(
+                f'{size:>10} {written:>14} {elapsed:>9.2f} {peak / 2**20:>12.2f} {max_rss:>12.1f}'
+            )
+
+    def seed(self, student, start, stop):
+        today = date.today()
+        statuses = ['accepted', 'rejected', 'pending']
+        batch = []
+        for i in range(start, stop):
+            batch.append(Certificate(
+                student=student,
+                title=f'Benchmark certificate {i}',
+                organization=f'Org {i % 100}',
+                issue_date=today - timedelta(days=365),
+                expiry_date=today + timedelta(days=i % 700),
+                file=f'certificates/bench-{i}.pdf',
+                status=statuses[i % 3],
+            ))
+            if len(batch) == 5000:
+                Certificate.objects.bulk_create(batch)
+                batch = []
+        Certificate.objects.bulk_create(batch)
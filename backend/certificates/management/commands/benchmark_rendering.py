@@ -0,0 +1,85 @@
+"""
+Management command to measure render time and bytes on the wire for the
+admin certificate list.
+
+Seeds synthetic certificates inside a transaction that is rolled back at the
+end, fetches AdminAllCertificatesView un-paginated, then renders its data
+with DRF's JSONRenderer and with FastJSONRenderer, and compresses the body
+with each encoding CompressionMiddleware can negotiate.
+
+Usage:
+    python manage.py benchmark_rendering                 # 50k rows
+    python manage.py benchmark_rendering --rows 10000 --repeat 5
+"""
+
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from backend import compression, renderers
+from certificates.benchmark import Rollback, benchmark_users, seed_certificates
+from certificates.views import AdminAllCertificatesView
+
+
+class Command(BaseCommand):
+    help = 'Benchmark JSON rendering and response compression on the admin certificate list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N runs (default: 3)')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp(prefix='certtrack-bench-')
+        try:
+            with override_settings(MEDIA_ROOT=media_root, DASHBOARD_CACHE={'ENABLED': False}), \
+                    transaction.atomic():
+                seed_certificates(students=max(options['rows'] // 10, 1), faculty=50,
+                                  certificates=options['rows'], prefix='__bench_render')
+                self.run(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run(self, repeat):
+        request = APIRequestFactory().get('/api/certificates/all/')
+        force_authenticate(request, user=benchmark_users()['admin'])
+        data = AdminAllCertificatesView.as_view()(request).data
+        self.stdout.write(f'{len(data)} rows\n')
+
+        self.stdout.write(f'{"renderer":<32} {"seconds":>9} {"bytes":>12} {"speedup":>8}')
+        paths = {'JSONRenderer (json)': JSONRenderer()}
+        if renderers.orjson:
+            paths['FastJSONRenderer (orjson)'] = renderers.FastJSONRenderer()
+        else:
+            self.stdout.write('  orjson is not installed; FastJSONRenderer falls back to json')
+        baseline = body = None
+        for name, renderer in paths.items():
+            best, body = self.best(repeat, renderer.render, data, 'application/json')
+            baseline = baseline or best
+            self.stdout.write(f'{name:<32} {best:>9.3f} {len(body):>12,} {baseline / best:>7.1f}x')
+
+        self.stdout.write(f'\n{"encoding":<32} {"seconds":>9} {"bytes":>12} {"ratio":>8}')
+        self.stdout.write(f'{"identity":<32} {0:>9.3f} {len(body):>12,} {1:>7.1f}x')
+        for encoding in reversed(compression.supported_encodings()):
+            best, compressed = self.best(repeat, compression.compress, body, encoding)
+            self.stdout.write(f'{encoding:<32} {best:>9.3f} {len(compressed):>12,} '
+                              f'{len(body) / len(compressed):>7.1f}x')
+        if not compression.brotli:
+            self.stdout.write('  brotli is not installed; only gzip is offered')
+
+    @staticmethod
+    def best(repeat, func, *args):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(*args)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
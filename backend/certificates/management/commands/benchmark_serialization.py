@@ -0,0 +1,70 @@
+"""
+Management command to compare list serialization paths.
+
+Seeds synthetic certificates inside a transaction that is rolled back at the
+end, then serializes the same rows with CertificateSerializer and with the
+``.values()`` fast path from listing.py, reporting rows per second.
+
+Usage:
+    python manage.py benchmark_serialization                 # 10k rows
+    python manage.py benchmark_serialization --rows 50000 --repeat 5
+"""
+
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from certificates.benchmark import Rollback, seed_certificates
+from certificates.listing import LIST_FIELDS, certificate_values, format_rows
+from certificates.models import Certificate
+from certificates.serializers import CertificateSerializer
+
+
+SPARSE_FIELDS = ('id', 'title', 'status', 'expiry_date')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark CertificateSerializer against the .values() list path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N runs (default: 3)')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp(prefix='certtrack-bench-')
+        try:
+            with override_settings(MEDIA_ROOT=media_root), transaction.atomic():
+                seed_certificates(students=max(options['rows'] // 10, 1), faculty=50,
+                                  certificates=options['rows'], prefix='__bench_serialize')
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run(self, rows, repeat):
+        queryset = Certificate.objects.with_people().order_by('-created_at', '-id')[:rows]
+        paths = {
+            'CertificateSerializer': lambda: CertificateSerializer(list(queryset), many=True).data,
+            'values() fast path': lambda: format_rows(certificate_values(queryset, LIST_FIELDS)),
+            f'values() ?fields={",".join(SPARSE_FIELDS)}':
+                lambda: format_rows(certificate_values(queryset, SPARSE_FIELDS), SPARSE_FIELDS),
+        }
+
+        self.stdout.write(f'{"path":<48} {"seconds":>9} {"rows/s":>10} {"speedup":>8}')
+        baseline = None
+        for name, serialize in paths.items():
+            best = min(self.timed(serialize) for _ in range(repeat))
+            baseline = baseline or best
+            self.stdout.write(f'{name:<48} {best:>9.3f} {rows / best:>10.0f} {baseline / best:>7.1f}x')
+
+    @staticmethod
+    def timed(serialize):
+        started = time.perf_counter()
+        serialize()
+        return time.perf_counter() - started
@@ -0,0 +1,34 @@
+"""
+Management command to delete certificate files no certificate references.
+
+Usage:
+    python manage.py gc_certificate_files                     # 1 hour grace period
+    python manage.py gc_certificate_files --grace-minutes 10
+    python manage.py gc_certificate_files --dry-run
+"""
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from certificates.blobs import collect_garbage
+from certificates.models import Certificate
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed certificate files whose reference count dropped to zero'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help='Only collect files unreferenced for this long (default: 60)')
+        parser.add_argument('--dry-run', action='store_true', help='List files without deleting them')
+
+    def handle(self, *args, **options):
+        storage = Certificate._meta.get_field('file').storage
+        removed = collect_garbage(
+            storage,
+            grace=timedelta(minutes=options['grace_minutes']),
+            dry_run=options['dry_run'],
+        )
+        for name in removed:
+            self.stdout.write(f'  🗑️  {name}')
+        verb = 'would be deleted' if options['dry_run'] else 'deleted'
+        self.stdout.write(self.style.SUCCESS(f'✅ Done! {len(removed)} file(s) {verb}.'))
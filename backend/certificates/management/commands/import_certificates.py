@@ -0,0 +1,59 @@
+"""
+Management command to bulk-import historical certificates.
+
+Usage:
+    python manage.py import_certificates manifest.csv --files ./certs/
+    python manage.py import_certificates manifest.ndjson --files certs.zip --chunk-size 2000
+    python manage.py import_certificates manifest.csv --files ./certs/ --dry-run
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from certificates.importer import CertificateImporter, open_files, read_manifest
+
+
+class Command(BaseCommand):
+    help = 'Bulk-import certificates from a CSV/NDJSON manifest and a directory or zip of files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='Path to the CSV or NDJSON manifest')
+        parser.add_argument('--files', required=True, help='Directory or zip archive holding the files')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Manifest format (default: by extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per INSERT batch (default: 1000)')
+        parser.add_argument(
+            '--reject-expired',
+            action='store_true',
+            help='Reject already-expired certificates like the upload endpoint does',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without writing anything')
+
+    def handle(self, *args, **options):
+        try:
+            files = open_files(options['files'])
+            manifest = open(options['manifest'], 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        importer = CertificateImporter(
+            files,
+            chunk_size=options['chunk_size'],
+            allow_expired=not options['reject_expired'],
+            dry_run=options['dry_run'],
+        )
+        started = time.monotonic()
+        with manifest:
+            result = importer.run(read_manifest(manifest, options['format']))
+        elapsed = time.monotonic() - started
+
+        for error in result.errors:
+            self.stdout.write(self.style.ERROR(f"  ❌ Row {error['row']}: {error['errors']}"))
+        if result.failed > len(result.errors):
+            self.stdout.write(self.style.ERROR(f'  … and {result.failed - len(result.errors)} more'))
+        if result.manifest_error:
+            self.stdout.write(self.style.ERROR(f'  ❌ {result.manifest_error}'))
+
+        verb = 'validated' if options['dry_run'] else 'imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Done! {result.created} of {result.rows} row(s) {verb}, '
+            f'{result.failed} failed ({elapsed:.1f}s).'
+        ))
@@ -0,0 +1,38 @@
+"""
+Management command to recompute the analytics rollup from scratch.
+
+Usage:
+    python manage.py rebuild_analytics              # Recompute and replace the rollup
+    python manage.py rebuild_analytics --check      # Only report drift (exit 1 if any)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from certificates.analytics import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the analytics rollup and report drift from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report drift without rewriting the rollup',
+        )
+
+    def handle(self, *args, **options):
+        check = options['check']
+        drift = rebuild_rollup(dry_run=check)
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✅ Analytics rollup is in sync.'))
+            return
+
+        self.stdout.write(f'\n📋 {len(drift)} counter(s) drifted:\n')
+        for (scope, key, status), (stored, expected) in sorted(drift.items()):
+            label = ':'.join(part for part in (scope, key, status) if part)
+            self.stdout.write(f'  {label} — stored {stored}, actual {expected}')
+
+        if check:
+            raise CommandError('Analytics rollup has drifted. Run rebuild_analytics to fix it.')
+        self.stdout.write(self.style.SUCCESS('\n✅ Done! Rollup rebuilt.'))
@@ -0,0 +1,22 @@
+"""
+Management command to rebuild the certificate full-text search index.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from certificates.models import Certificate
+from certificates.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = 'Re-index every certificate for full-text search'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            update_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Done! {Certificate.objects.count()} certificate(s) indexed.'
+        ))
@@ -0,0 +1,46 @@
+"""
+Management command to run the expiry reminder scheduler.
+
+Usage:
+    python manage.py run_scheduler                 # Run until stopped
+    python manage.py run_scheduler --once          # Send everything due now and exit
+    python manage.py run_scheduler --batch 200 --max-sleep 60
+
+Certificates are alerted when their precomputed ``next_alert_at`` passes;
+see certificates/scheduler.py.
+"""
+
+import signal
+from django.core.management.base import BaseCommand
+from certificates.scheduler import AlertScheduler
+
+
+class Command(BaseCommand):
+    help = 'Send expiry alerts as certificates fall due, sleeping until the next one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send every alert due now, then exit',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=None,
+            help='Due certificates handled per tick (default: EXPIRY_ALERTS BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=None,
+            help='Longest wait between checks in seconds (default: EXPIRY_ALERTS MAX_SLEEP)',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = AlertScheduler(batch_size=options['batch'], max_sleep=options['max_sleep'])
+        signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: scheduler.stop())
+
+        self.stdout.write('⏰ Expiry alert scheduler started.')
+        scheduler.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Scheduler stopped. {scheduler.sent} alert(s) queued '
+            f'for {scheduler.processed} due certificate(s).'
+        ))
@@ -4,12 +4,24 @@ Management command to send email alerts for certificates expiring within 30 days
 Usage:
     python manage.py send_expiry_alerts              # Send actual emails
     python manage.py send_expiry_alerts --dry-run     # Preview without sending
+    python manage.py send_expiry_alerts --workers 8 --batch-size 200 --rate 50
+
+Certificates are streamed from the database grouped by student, and emails
+are delivered in batches over reused mail connections by a worker pool.
+
+Each certificate is alerted once per threshold bucket (30, 15 and 7 days).
+Delivered alerts are recorded in the SentAlert ledger batch by batch, so
+reruns skip them and an interrupted run resumes where it stopped.
 """
 
 from datetime import date, timedelta
+from itertools import groupby
 from django.core.management.base import BaseCommand
-from certificates.models import Certificate
-from accounts.emails import send_expiry_alert_email
+from django.db.models import Exists, OuterRef
+from certificates.delivery import BatchMailer
+from certificates.models import Certificate, SentAlert
+from certificates.utils import alert_bucket_expression
+from accounts.emails import build_expiry_alert_email, from_email
 
 
 class Command(BaseCommand):
@@ -21,9 +33,30 @@ class Command(BaseCommand):
             action='store_true',
             help='Preview alerts without sending emails',
         )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Emails sent per mail connection (default: 100)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Parallel delivery threads (default: 4)',
+        )
+        parser.add_argument(
+            '--rate', type=float, default=0,
+            help='Maximum emails per second, 0 for unlimited (default: 0)',
+        )
+        parser.add_argument(
+            '--retries', type=int, default=3,
+            help='Retries per failed batch (default: 3)',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched per database round trip (default: 2000)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        verbose = dry_run or options['verbosity'] > 1
         today = date.today()
         threshold = today + timedelta(days=30)
 
@@ -32,43 +65,83 @@ class Command(BaseCommand):
             expiry_date__gte=today,
             expiry_date__lte=threshold,
             status='accepted',          # Only alert on accepted certs
-        ).select_related('student')
+        ).annotate(
+            bucket=alert_bucket_expression(today),
+        ).filter(
+            # Skip certificates already alerted for their current bucket
+            ~Exists(SentAlert.objects.filter(certificate=OuterRef('pk'), bucket=OuterRef('bucket'))),
+        ).select_related('student').order_by('student_id', 'expiry_date')
 
-        if not expiring.exists():
-            self.stdout.write(self.style.SUCCESS('✅ No certificates expiring within 30 days.'))
-            return
+        mailer = None if dry_run else BatchMailer(
+            from_email(),
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            rate=options['rate'],
+            retries=options['retries'],
+            on_delivered=self.record_sent,
+        )
 
-        # Group by student
-        student_certs = {}
-        for cert in expiring:
-            student_certs.setdefault(cert.student, []).append(cert)
+        total_certs = 0
+        students = 0
+        skipped = 0
+        try:
+            rows = expiring.iterator(chunk_size=options['chunk_size'])
+            for _, group in groupby(rows, key=lambda c: c.student_id):
+                certs = list(group)
+                student = certs[0].student
+                total_certs += len(certs)
+                students += 1
 
-        self.stdout.write(f'\n📋 Found {expiring.count()} certificate(s) expiring within 30 days:\n')
+                if verbose:
+                    self.stdout.write(f'  👤 {student.get_full_name() or student.username} ({student.email})')
+                    for c in certs:
+                        days_left = (c.expiry_date - today).days
+                        icon = '🔴' if days_left <= 7 else ('🟡' if days_left <= 15 else '🟢')
+                        self.stdout.write(f'     {icon} {c.title} — expires {c.expiry_date} ({days_left} day(s) left)')
 
-        emails_sent = 0
-        for student, certs in student_certs.items():
-            self.stdout.write(f'  👤 {student.get_full_name() or student.username} ({student.email})')
-            for c in certs:
-                days_left = (c.expiry_date - today).days
-                icon = '🔴' if days_left <= 7 else ('🟡' if days_left <= 15 else '🟢')
-                self.stdout.write(f'     {icon} {c.title} — expires {c.expiry_date} ({days_left} day(s) left)')
+                if dry_run:
+                    self.stdout.write(self.style.WARNING('     ⏭️  Skipped (dry run)\n'))
+                    continue
 
-            if dry_run:
-                self.stdout.write(self.style.WARNING('     ⏭️  Skipped (dry run)\n'))
-                continue
+                if not student.email:
+                    skipped += 1
+                    if verbose:
+                        self.stdout.write(self.style.WARNING('     ⚠️  No email address — skipped\n'))
+                    continue
 
-            if not student.email:
-                self.stdout.write(self.style.WARNING('     ⚠️  No email address — skipped\n'))
-                continue
+                subject, message = build_expiry_alert_email(student, certs)
+                mailer.add(subject, message, student.email, tag=[(c.pk, c.bucket) for c in certs])
+        finally:
+            if mailer:
+                mailer.close()
 
-            try:
-                send_expiry_alert_email(student, certs)
-                emails_sent += 1
-                self.stdout.write(self.style.SUCCESS(f'     ✅ Email sent!\n'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'     ❌ Failed: {e}\n'))
+        if not total_certs:
+            self.stdout.write(self.style.SUCCESS('✅ No new expiry alerts due within 30 days.'))
+            return
+
+        self.stdout.write(
+            f'\n📋 Found {total_certs} certificate(s) expiring within 30 days '
+            f'for {students} student(s).'
+        )
 
         if dry_run:
             self.stdout.write(self.style.WARNING(f'\n🔍 Dry run complete. No emails sent.'))
-        else:
-            self.stdout.write(self.style.SUCCESS(f'\n✅ Done! {emails_sent} email(s) sent.'))
+            return
+
+        report = mailer.report
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'⚠️  {skipped} student(s) without an email address skipped.'))
+        for error in report.errors:
+            self.stdout.write(self.style.ERROR(f'❌ Failed batch: {error}'))
+        self.stdout.write(
+            f'📊 {report.sent} sent, {report.failed} failed, {report.retries} retried '
+            f'in {report.batches} batch(es) — {report.elapsed:.1f}s, {report.throughput:.1f} email(s)/s'
+        )
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Done! {report.sent} email(s) sent.'))
+
+    def record_sent(self, tags):
+        """Commit ledger entries for one delivered batch."""
+        SentAlert.objects.bulk_create(
+            [SentAlert(certificate_id=pk, bucket=bucket) for tag in tags for pk, bucket in tag],
+            ignore_conflicts=True,
+        )
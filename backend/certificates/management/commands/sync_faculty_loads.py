@@ -0,0 +1,17 @@
+"""
+Management command to recompute each faculty member's pending counter.
+
+Usage:
+    python manage.py sync_faculty_loads
+"""
+
+from django.core.management.base import BaseCommand
+from certificates.assignment import rebuild_faculty_loads
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-faculty pending certificate counters used for assignment'
+
+    def handle(self, *args, **options):
+        changed = rebuild_faculty_loads()
+        self.stdout.write(self.style.SUCCESS(f'✅ Done! {changed} faculty load(s) corrected.'))
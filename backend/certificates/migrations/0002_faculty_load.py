@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_faculty_loads(apps, schema_editor):
+    """Seed a load row per faculty member with their current pending count."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    FacultyLoad = apps.get_model('certificates', 'FacultyLoad')
+    faculty = User.objects.filter(role='faculty').annotate(
+        pending_count=Count('assigned_certificates', filter=Q(assigned_certificates__status='pending'))
+    ).values_list('id', 'pending_count')
+    FacultyLoad.objects.bulk_create(
+        [FacultyLoad(faculty_id=pk, pending=pending) for pk, pending in faculty],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('certificates', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacultyLoad',
+            fields=[
+                ('faculty', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_load', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('pending', models.PositiveIntegerField(default=0)),
+                ('last_assigned_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'faculty_loads',
+                'indexes': [models.Index(fields=['pending', 'last_assigned_at'], name='faculty_load_pending_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_faculty_loads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:13
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+# Frozen copy of certificates.analytics.compute_rollup as of this migration,
+# so later changes there cannot alter what it does. Run rebuild_analytics to
+# pick them up.
+def backfill_analytics(apps, schema_editor):
+    """Seed the rollup from the existing certificates and users."""
+    Certificate = apps.get_model('certificates', 'Certificate')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    AnalyticsCounter = apps.get_model('certificates', 'AnalyticsCounter')
+    certificates = Certificate.objects.order_by()
+
+    counts = Counter()
+    for row in certificates.values('status').annotate(n=Count('id')):
+        counts[('status', '', row['status'])] = row['n']
+    for row in certificates.values('organization', 'status').annotate(n=Count('id')):
+        counts[('organization', row['organization'], row['status'])] = row['n']
+    for row in (certificates.filter(faculty__isnull=False)
+                .values('faculty_id', 'status').annotate(n=Count('id'))):
+        counts[('faculty', str(row['faculty_id']), row['status'])] = row['n']
+    for row in (certificates.annotate(day=TruncDate('created_at'))
+                .values('day', 'status').annotate(n=Count('id'))):
+        counts[('day', row['day'].isoformat(), row['status'])] += row['n']
+    for row in User.objects.order_by().values('role').annotate(n=Count('id')):
+        counts[('users', row['role'], '')] = row['n']
+
+    AnalyticsCounter.objects.bulk_create(
+        [AnalyticsCounter(scope=s, key=k, status=st, count=n) for (s, k, st), n in counts.items() if n],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0002_faculty_load'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('status', 'Status'), ('organization', 'Organization'), ('faculty', 'Faculty'), ('day', 'Day'), ('users', 'Users')], max_length=20)),
+                ('key', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(blank=True, default='', max_length=10)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'analytics_counters',
+                'constraints': [models.UniqueConstraint(fields=('scope', 'key', 'status'), name='analytics_counter_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_analytics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0004_certificate_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField(choices=[(30, '30 days'), (15, '15 days'), (7, '7 days')])),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('certificate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sent_alerts', to='certificates.certificate')),
+            ],
+            options={
+                'db_table': 'sent_alerts',
+                'constraints': [models.UniqueConstraint(fields=('certificate', 'bucket'), name='sent_alert_unique')],
+            },
+        ),
+    ]
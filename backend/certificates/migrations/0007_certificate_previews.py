@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0006_content_addressed_files'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='preview',
+            field=models.FileField(blank=True, default='', editable=False, upload_to='certificates/previews/'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='thumbnail',
+            field=models.FileField(blank=True, default='', editable=False, upload_to='certificates/previews/'),
+        ),
+    ]
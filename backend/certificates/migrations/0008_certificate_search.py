@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:44
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+# Self-contained on purpose: later changes to certificates/search.py must not
+# alter what this migration does. Run rebuild_search_index to pick them up.
+FTS_TABLE = 'certificate_search'
+
+
+def build_search_index(apps, schema_editor):
+    """GIN index on PostgreSQL, FTS5 table on SQLite; then index existing rows."""
+    vendor = schema_editor.connection.vendor
+    certificates = apps.get_model('certificates', 'Certificate')._meta.db_table
+    users = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+
+    if vendor == 'postgresql':
+        config = getattr(settings, 'CERTIFICATE_SEARCH', {}).get('CONFIG', 'english')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS cert_search_idx ON {certificates} USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            f"UPDATE {certificates} AS c SET search_vector = "
+            f"setweight(to_tsvector(%s::regconfig, coalesce(c.title, '')), 'A') || "
+            f"setweight(to_tsvector(%s::regconfig, coalesce(c.organization, '')), 'B') || "
+            f"setweight(to_tsvector('simple', concat_ws(' ', u.first_name, u.last_name, u.username)), 'B') || "
+            f"setweight(to_tsvector(%s::regconfig, coalesce(c.remarks, '')), 'C') "
+            f"FROM {users} AS u WHERE u.id = c.student_id",
+            [config, config, config],
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"title, organization, remarks, student, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, organization, remarks, student) "
+            f"SELECT c.id, c.title, c.organization, c.remarks, "
+            f"u.first_name || ' ' || u.last_name || ' ' || u.username "
+            f"FROM {certificates} AS c JOIN {users} AS u ON u.id = c.student_id"
+        )
+
+
+def remove_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS cert_search_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0007_certificate_previews'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(build_search_index, remove_search_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:48
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Self-contained on purpose: a frozen copy of certificates.scheduler.next_alert_at
+ALERT_BUCKETS = (7, 15, 30)
+
+
+def next_alert_at(expiry_date, sent, today, send_hour):
+    widest_first = sorted(ALERT_BUCKETS, reverse=True)
+    for days, tighter in zip(widest_first, [*widest_first[1:], -1]):
+        ends = expiry_date - timedelta(days=tighter)
+        if days in sent or ends <= today:
+            continue
+        opens = expiry_date - timedelta(days=days)
+        return timezone.make_aware(datetime.combine(opens, time(hour=send_hour)))
+    return None
+
+
+def backfill_next_alert(apps, schema_editor):
+    """Schedule accepted certificates that have not expired yet, minding alerts already sent."""
+    Certificate = apps.get_model('certificates', 'Certificate')
+    SentAlert = apps.get_model('certificates', 'SentAlert')
+    today = timezone.localdate()
+    send_hour = getattr(settings, 'EXPIRY_ALERTS', {}).get('SEND_HOUR', 9)
+    sent = defaultdict(set)
+    for pk, bucket in SentAlert.objects.values_list('certificate_id', 'bucket').iterator():
+        sent[pk].add(bucket)
+
+    certs = Certificate.objects.filter(status='accepted', expiry_date__gte=today).only('id', 'expiry_date')
+    batch = []
+    for cert in certs.iterator(chunk_size=2000):
+        cert.next_alert_at = next_alert_at(cert.expiry_date, sent[cert.pk], today, send_hour)
+        if cert.next_alert_at:
+            batch.append(cert)
+        if len(batch) >= 1000:
+            Certificate.objects.bulk_update(batch, ['next_alert_at'])
+            batch = []
+    Certificate.objects.bulk_update(batch, ['next_alert_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0008_certificate_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='next_alert_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(condition=models.Q(('next_alert_at__isnull', False)), fields=['next_alert_at'], name='cert_next_alert_idx'),
+        ),
+        migrations.RunPython(backfill_next_alert, migrations.RunPython.noop),
+    ]
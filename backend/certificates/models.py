@@ -1,5 +1,39 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+
+from .storage import certificate_storage
+
+
+# User columns needed to render student/faculty display names.
+PERSON_FIELDS = ('username', 'first_name', 'last_name')
+
+
+class CertificateQuerySet(models.QuerySet):
+    """Query helpers shared by the certificate list endpoints."""
+
+    def visible_to(self, user):
+        """Students see their own certificates, faculty those assigned to them, admins all."""
+        if user.role == 'admin':
+            return self.all()
+        if user.role == 'faculty':
+            return self.filter(faculty=user)
+        if user.role == 'student':
+            return self.filter(student=user)
+        return self.none()
+
+    def with_people(self):
+        """
+        Join student and faculty in the same query, loading only the
+        columns used for their display names.
+        """
+        related = [
+            f'{rel}__{field}'
+            for rel in ('student', 'faculty')
+            for field in PERSON_FIELDS
+        ]
+        own = [f.name for f in self.model._meta.concrete_fields if f.name != 'search_vector']
+        return self.select_related('student', 'faculty').only(*own, *related)
 
 
 class Certificate(models.Model):
@@ -27,14 +61,191 @@ class Certificate(models.Model):
     organization = models.CharField(max_length=255)
     issue_date = models.DateField()
     expiry_date = models.DateField(null=True, blank=True)
-    file = models.FileField(upload_to='certificates/')
+    file = models.FileField(upload_to='certificates/', storage=certificate_storage)
+    file_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    # WebP renditions, filled in by the certificates.build_previews job
+    thumbnail = models.FileField(upload_to='certificates/previews/', blank=True, default='', editable=False)
+    preview = models.FileField(upload_to='certificates/previews/', blank=True, default='', editable=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     remarks = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Weighted full-text vector, maintained by certificates.search (PostgreSQL only;
+    # the GIN index is created in migration 0008 since SQLite cannot build it)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # When the next expiry alert is due; see certificates.scheduler
+    next_alert_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CertificateQuerySet.as_manager()
 
     class Meta:
         db_table = 'certificates'
         ordering = ['-created_at']
+        indexes = [
+            # Student dashboard and performance breakdowns
+            models.Index(fields=['student', 'status'], name='cert_student_status_idx'),
+            # Faculty queue and stats
+            models.Index(fields=['faculty', 'status'], name='cert_faculty_status_idx'),
+            models.Index(
+                fields=['faculty'], name='cert_pending_faculty_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # Expiry alerts range-scan expiry_date
+            models.Index(
+                fields=['expiry_date', 'status'], name='cert_expiry_status_idx',
+                condition=models.Q(expiry_date__isnull=False),
+            ),
+            # Newest-first lists and keyset pagination
+            models.Index(fields=['-created_at', '-id'], name='cert_created_idx'),
+            # Organization affinity in faculty assignment
+            models.Index(fields=['organization', '-created_at'], name='cert_org_created_idx'),
+            # Duplicate submission detection
+            models.Index(fields=['file_hash', 'student'], name='cert_file_hash_idx'),
+            # Expiry reminder scheduler fetches only due rows
+            models.Index(
+                fields=['next_alert_at'], name='cert_next_alert_idx',
+                condition=models.Q(next_alert_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.student.username} ({self.status})"
+
+    # Columns next_alert_at is derived from
+    ALERT_FIELDS = {'status', 'expiry_date'}
+
+    def schedule_alert(self, sent=None):
+        """
+        Recompute next_alert_at, skipping buckets already in the SentAlert
+        ledger. Bulk paths call this before writing and pass ``sent`` (this
+        certificate's alerted buckets) to avoid a query per row.
+        """
+        from .scheduler import next_alert_at, sent_alerts
+        if sent is None:
+            schedulable = self.pk and self.status == 'accepted' and self.expiry_date
+            sent = sent_alerts([self.pk])[self.pk] if schedulable else ()
+        self.next_alert_at = next_alert_at(self.expiry_date, self.status, sent)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.ALERT_FIELDS & set(update_fields):
+            self.schedule_alert()
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'next_alert_at']
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Remember the loaded column values so signal handlers can tell what
+        # changed on save without re-reading the row.
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if value is not models.DEFERRED
+        }
+        return instance
+
+
+class FacultyLoad(models.Model):
+    """
+    Denormalized count of pending certificates assigned to a faculty member.
+    Kept in step by the assignment engine so uploads never aggregate.
+    """
+
+    faculty = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='review_load'
+    )
+    pending = models.PositiveIntegerField(default=0)
+    last_assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'faculty_loads'
+        indexes = [
+            models.Index(fields=['pending', 'last_assigned_at'], name='faculty_load_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.faculty.username} — {self.pending} pending"
+
+
+class AnalyticsCounter(models.Model):
+    """
+    One incrementally maintained counter of the analytics rollup, e.g.
+    ('organization', 'AWS', 'accepted') or ('users', 'faculty', '').
+    """
+
+    SCOPE_CHOICES = (
+        ('status', 'Status'),
+        ('organization', 'Organization'),
+        ('faculty', 'Faculty'),
+        ('day', 'Day'),
+        ('users', 'Users'),
+    )
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=255, blank=True, default='')
+    status = models.CharField(max_length=10, blank=True, default='')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'analytics_counters'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key', 'status'], name='analytics_counter_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}:{self.status} = {self.count}"
+
+
+class SentAlert(models.Model):
+    """
+    Ledger of expiry alerts already emailed, one row per certificate and
+    threshold bucket, so reruns of send_expiry_alerts never re-notify.
+    """
+
+    BUCKET_CHOICES = (
+        (30, '30 days'),
+        (15, '15 days'),
+        (7, '7 days'),
+    )
+
+    certificate = models.ForeignKey(
+        Certificate,
+        on_delete=models.CASCADE,
+        related_name='sent_alerts'
+    )
+    bucket = models.PositiveSmallIntegerField(choices=BUCKET_CHOICES)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sent_alerts'
+        constraints = [
+            models.UniqueConstraint(fields=['certificate', 'bucket'], name='sent_alert_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.certificate_id} — {self.bucket}-day alert"
+
+
+class StoredFile(models.Model):
+    """Reference count for one content-addressed certificate file."""
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    refcount = models.PositiveIntegerField(default=0)
+    released_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stored_files'
+        indexes = [
+            models.Index(
+                fields=['released_at'], name='stored_file_unreferenced_idx',
+                condition=models.Q(refcount=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} reference(s))"
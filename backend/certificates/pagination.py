@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination for certificate list endpoints.
+
+Pages are keyed on ``(created_at, id)`` so each page is a single indexed
+range scan, no matter how deep the client has scrolled. Pagination is
+opt-in: a request without ``cursor`` or ``page_size`` keeps the original
+un-paginated list response.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """Paginate a certificate queryset newest-first on ``(created_at, id)``."""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor = None
+
+    # ── Public API ──
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Returns a list with one page of results, or None if the request
+        did not ask for pagination.
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether another page follows.
+        page = list(queryset[:size + 1])
+        if len(page) > size:
+            page = page[:size]
+            last = page[-1]
+            # Rows are model instances or, on the fast list path, .values() dicts
+            if isinstance(last, dict):
+                self.next_cursor = self.encode_cursor(last['created_at'], last['id'])
+            else:
+                self.next_cursor = self.encode_cursor(last.created_at, last.pk)
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    # ── Helpers ──
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if size < 1:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    @staticmethod
+    def encode_cursor(created_at, pk):
+        payload = json.dumps({'c': created_at.isoformat(), 'i': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            created_at = parse_datetime(payload['c'])
+            pk = int(payload['i'])
+        except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+            raise NotFound('Invalid cursor.')
+        if created_at is None:
+            raise NotFound('Invalid cursor.')
+        return created_at, pk
@@ -0,0 +1,135 @@
+"""
+WebP thumbnails and previews for certificate files.
+
+Renditions are derived from the stored blob, so they are named after its
+digest and shared by every certificate with the same file:
+
+    certificates/previews/3f/3fa9…e1-thumbnail.webp
+    certificates/previews/3f/3fa9…e1-preview.webp
+
+Images are decoded with Pillow. PDFs are rasterized (first page only) with
+poppler's ``pdftoppm`` when it is installed; without it PDF certificates
+simply have no preview.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .caching import bump_versions
+from .models import Certificate
+
+
+logger = logging.getLogger(__name__)
+
+# rendition name -> longest edge in pixels
+RENDITIONS = {
+    'thumbnail': 320,
+    'preview': 1280,
+}
+
+WEBP_QUALITY = 80
+
+
+class PreviewError(Exception):
+    """The file cannot be rendered; retrying will not help."""
+
+
+def rendition_name(digest, rendition):
+    return f"certificates/previews/{digest[:2]}/{digest}-{rendition}.webp"
+
+
+def open_pdf_page(path, size):
+    """Rasterize the first page of a PDF to a PIL image, scaled to ``size``."""
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm is None:
+        raise PreviewError('pdftoppm is not installed.')
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'page')
+        try:
+            subprocess.run(
+                [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-png',
+                 '-scale-to', str(size), path, prefix],
+                check=True, capture_output=True, timeout=60,
+            )
+        except subprocess.CalledProcessError as e:
+            raise PreviewError(e.stderr.decode(errors='replace').strip() or 'pdftoppm failed.')
+        image = Image.open(prefix + '.png')
+        image.load()
+        return image
+
+
+def open_image(fileobj, size):
+    try:
+        image = Image.open(fileobj)
+        # Let JPEG decode at reduced scale instead of full resolution
+        image.draft('RGB', (size, size))
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise PreviewError(str(e))
+    return ImageOps.exif_transpose(image)
+
+
+def encode_webp(image, size):
+    image = image.copy()
+    image.thumbnail((size, size))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    out = BytesIO()
+    image.save(out, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return out.getvalue()
+
+
+def render_source(cert):
+    """Decode the certificate file once, at the largest rendition size."""
+    size = max(RENDITIONS.values())
+    storage = cert.file.storage
+    if cert.file.name.lower().endswith('.pdf'):
+        return open_pdf_page(storage.path(cert.file.name), size)
+    with storage.open(cert.file.name, 'rb') as fileobj:
+        return open_image(fileobj, size)
+
+
+def build_previews(digest):
+    """
+    Render the renditions for one stored file, unless they already exist,
+    and point every certificate with that file at them.
+    Returns the number of certificates updated.
+    """
+    names = {rendition: rendition_name(digest, rendition) for rendition in RENDITIONS}
+    missing = [rendition for rendition, name in names.items() if not default_storage.exists(name)]
+
+    if missing:
+        cert = Certificate.objects.filter(file_hash=digest).only('file').first()
+        if cert is None:
+            return 0
+        source = render_source(cert)
+        for rendition in missing:
+            data = encode_webp(source, RENDITIONS[rendition])
+            # A concurrent render of the same file may have won; keep its copy.
+            if not default_storage.exists(names[rendition]):
+                default_storage.save(names[rendition], ContentFile(data))
+
+    targets = list(
+        Certificate.objects.filter(file_hash=digest, thumbnail='').values_list('pk', 'student_id', 'faculty_id')
+    )
+    if not targets:
+        return 0
+    updated = Certificate.objects.filter(pk__in=[pk for pk, _, _ in targets], thumbnail='').update(
+        thumbnail=names['thumbnail'], preview=names['preview'],
+    )
+    # update() sends no signals; cached dashboards must pick up the new URLs
+    bump_versions({user_id for _, *people in targets for user_id in people})
+    return updated
+
+
+def delete_previews(digest, storage=default_storage):
+    for rendition in RENDITIONS:
+        storage.delete(rendition_name(digest, rendition))
@@ -0,0 +1,70 @@
+"""
+Bulk certificate review for faculty.
+
+``review_certificates`` applies many accept/reject decisions in one
+transaction: one locked SELECT to check ownership, one ``bulk_update``
+(a CASE per column) for the rows, and batched counter updates. Because
+``bulk_update`` sends no signals, it does the work of the certificate
+signal handlers itself: analytics deltas, faculty load, dashboard versions,
+the search index and live events. It also reschedules expiry alerts, which
+``Certificate.save`` would otherwise do.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+
+from .analytics import TRACKED_FIELDS, apply_deltas, certificate_keys, instance_values
+from .assignment import release_faculty
+from .caching import bump_versions
+from .events import publish_event
+from .models import Certificate
+from .scheduler import sent_alerts
+from .search import update_search_index
+
+
+MAX_BULK_REVIEWS = 500
+
+
+def review_certificates(faculty, reviews):
+    """
+    Apply ``[{'id', 'status', 'remarks'}, ...]`` to certificates assigned to
+    ``faculty``. Returns (reviewed certificates, ids that were not found).
+    """
+    by_id = {review['id']: review for review in reviews}
+    with transaction.atomic():
+        certs = list(
+            Certificate.objects.select_for_update()
+            .filter(faculty=faculty, pk__in=by_id)
+            .only('id', 'student_id', 'remarks', 'expiry_date', *TRACKED_FIELDS)
+        )
+
+        # Ledger read only when some certificate becomes schedulable
+        accepted = [cert.pk for cert in certs if cert.expiry_date and by_id[cert.pk]['status'] == 'accepted']
+        sent = sent_alerts(accepted) if accepted else {}
+
+        deltas = Counter()
+        released = 0
+        for cert in certs:
+            review = by_id[cert.pk]
+            for key in certificate_keys(instance_values(cert)):
+                deltas[key] -= 1
+            # Leaving 'pending' frees the faculty member's assignment slot
+            if cert.status == 'pending':
+                released += 1
+            cert.status = review['status']
+            cert.remarks = review.get('remarks', '')
+            cert.schedule_alert(sent.get(cert.pk, ()))
+            for key in certificate_keys(instance_values(cert)):
+                deltas[key] += 1
+
+        Certificate.objects.bulk_update(certs, ['status', 'remarks', 'next_alert_at'])
+        apply_deltas(deltas)
+        release_faculty(faculty.pk, released)
+        update_search_index(ids=[cert.pk for cert in certs])
+        bump_versions({faculty.pk} | {cert.student_id for cert in certs})
+        for cert in certs:
+            publish_event([cert.student_id, faculty.pk], 'certificate.reviewed', certificate=cert.pk, status=cert.status)
+
+    found = {cert.pk for cert in certs}
+    return certs, [pk for pk in by_id if pk not in found]
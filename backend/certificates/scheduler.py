@@ -0,0 +1,161 @@
+"""
+In-process scheduler for certificate expiry reminders.
+
+Every certificate carries ``next_alert_at``: when its next expiry alert
+(30, 15 or 7 days before expiry) falls due, or NULL when none will. It is
+recomputed whenever the certificate is saved or reviewed, so the scheduler
+never has to scan the 30-day window:
+
+    python manage.py run_scheduler
+
+Each tick locks the due rows through the partial index on
+``next_alert_at``, queues one email per student, records the SentAlert
+ledger and moves every row on to its next due time, all in one
+transaction. Between ticks it sleeps until the earliest ``next_alert_at``.
+
+    EXPIRY_ALERTS = {
+        'SEND_HOUR': 9,       # local hour an alert falls due on its day
+        'BATCH_SIZE': 500,    # due certificates handled per tick
+        'MAX_SLEEP': 300,     # seconds; picks up rows scheduled by other processes
+    }
+
+``send_expiry_alerts`` still works for one-off or dry runs and shares the
+same ledger, so the two never double-notify.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.emails import send_expiry_alert_email
+from .models import Certificate, SentAlert
+from .utils import ALERT_BUCKETS, alert_bucket
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SEND_HOUR': 9,
+    'BATCH_SIZE': 500,
+    'MAX_SLEEP': 300,
+}
+
+
+def get_config(key):
+    return getattr(settings, 'EXPIRY_ALERTS', {}).get(key, DEFAULTS[key])
+
+
+# ───────────────────────── Due times ─────────────────────────
+
+def next_alert_at(expiry_date, status, sent=(), today=None):
+    """
+    When the next unsent alert bucket opens for this certificate, or None.
+
+    A bucket's alert is only sent while it is the tightest bucket the
+    certificate falls in, matching ``alert_bucket``; buckets already passed
+    are skipped rather than sent late.
+    """
+    if status != 'accepted' or expiry_date is None:
+        return None
+    today = today or timezone.localdate()
+    widest_first = sorted(ALERT_BUCKETS, reverse=True)
+    for days, tighter in zip(widest_first, [*widest_first[1:], -1]):
+        # The bucket lasts until the next tighter one opens (or the day after expiry)
+        ends = expiry_date - timedelta(days=tighter)
+        if days in sent or ends <= today:
+            continue
+        opens = expiry_date - timedelta(days=days)
+        return timezone.make_aware(datetime.combine(opens, time(hour=get_config('SEND_HOUR'))))
+    return None
+
+
+def sent_alerts(ids):
+    """{certificate id: {buckets already alerted}} from the SentAlert ledger."""
+    sent = defaultdict(set)
+    for pk, bucket in SentAlert.objects.filter(certificate_id__in=ids).values_list('certificate_id', 'bucket'):
+        sent[pk].add(bucket)
+    return sent
+
+
+# ───────────────────────── Ticks ─────────────────────────
+
+def send_due_alerts(now=None, limit=None):
+    """
+    Alert every certificate whose ``next_alert_at`` has passed and schedule
+    its next alert. Returns (certificates processed, alerts sent).
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    limit = limit or get_config('BATCH_SIZE')
+
+    with transaction.atomic():
+        query = Certificate.objects.filter(next_alert_at__lte=now).order_by('next_alert_at')
+        if connection.features.has_select_for_update_skip_locked:
+            query = query.select_for_update(skip_locked=True, of=('self',))
+        due = list(query.select_related('student')[:limit])
+        if not due:
+            return 0, 0
+
+        sent = sent_alerts([cert.pk for cert in due])
+
+        alerts, ledger = defaultdict(list), []
+        for cert in due:
+            bucket = alert_bucket(cert.expiry_date, today) if cert.status == 'accepted' else None
+            if bucket and bucket not in sent[cert.pk]:
+                alerts[cert.student_id].append(cert)
+                ledger.append(SentAlert(certificate=cert, bucket=bucket))
+                sent[cert.pk].add(bucket)
+            cert.next_alert_at = next_alert_at(cert.expiry_date, cert.status, sent[cert.pk], today)
+
+        Certificate.objects.bulk_update(due, ['next_alert_at'])
+        SentAlert.objects.bulk_create(ledger, ignore_conflicts=True)
+        for certs in alerts.values():
+            if certs[0].student:
+                send_expiry_alert_email(certs[0].student, sorted(certs, key=lambda c: c.expiry_date))
+
+    return len(due), len(ledger)
+
+
+def next_due_time():
+    return (
+        Certificate.objects.filter(next_alert_at__isnull=False)
+        .order_by('next_alert_at').values_list('next_alert_at', flat=True).first()
+    )
+
+
+class AlertScheduler:
+    """Run ticks until stopped, sleeping until the earliest due certificate in between."""
+
+    def __init__(self, batch_size=None, max_sleep=None):
+        self.batch_size = batch_size or get_config('BATCH_SIZE')
+        self.max_sleep = max_sleep if max_sleep is not None else get_config('MAX_SLEEP')
+        self.stopped = threading.Event()
+        self.processed = self.sent = 0
+
+    def stop(self):
+        self.stopped.set()
+
+    def seconds_until_due(self):
+        due = next_due_time()
+        if due is None:
+            return self.max_sleep
+        # At least a second, so rows locked by another scheduler are not spun on
+        return min(max((due - timezone.now()).total_seconds(), 1), self.max_sleep)
+
+    def run(self, once=False):
+        while not self.stopped.is_set():
+            processed, sent = send_due_alerts(limit=self.batch_size)
+            self.processed += processed
+            self.sent += sent
+            if sent:
+                logger.info(f'Queued {sent} expiry alert(s) for {processed} due certificate(s).')
+            if processed >= self.batch_size:
+                continue
+            if once:
+                break
+            self.stopped.wait(self.seconds_until_due())
@@ -0,0 +1,158 @@
+"""
+Full-text search over certificates.
+
+The index covers title, organization, remarks and the student's name, and
+is kept per database:
+
+- PostgreSQL: ``Certificate.search_vector`` (weighted tsvector) with a GIN
+  index, queried with ``websearch_to_tsquery`` and ranked by ``ts_rank``.
+- SQLite: an FTS5 table ``certificate_search`` keyed by certificate id,
+  ranked with bm25.
+- Anything else: ``icontains`` over the same columns, unranked.
+
+The index is refreshed from the certificate and user signals, the bulk
+import and the bulk review. ``python manage.py rebuild_search_index``
+rebuilds it from scratch.
+
+    CERTIFICATE_SEARCH = {'CONFIG': 'english'}   # PostgreSQL text search configuration
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'certificate_search'   # created by migration 0008
+
+# Weights: title > organization, student > remarks
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 5.0)   # title, organization, remarks, student
+
+ID_CHUNK = 500
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def search_config():
+    return getattr(settings, 'CERTIFICATE_SEARCH', {}).get('CONFIG', 'english')
+
+
+def _tables():
+    from accounts.models import CustomUser
+    from .models import Certificate
+    return Certificate._meta.db_table, CustomUser._meta.db_table
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), ID_CHUNK):
+        yield ids[i:i + ID_CHUNK]
+
+
+# ───────────────────────── Maintenance ─────────────────────────
+
+def update_search_index(ids=None, student_ids=None, using=connection):
+    """
+    Re-index the given certificates, every certificate of the given
+    students, or (with neither) all certificates.
+    """
+    certificates, users = _tables()
+    if ids is not None:
+        column, groups = 'c.id', list(_chunks(ids))
+    elif student_ids is not None:
+        column, groups = 'c.student_id', list(_chunks(student_ids))
+    else:
+        column, groups = None, [None]
+
+    with using.cursor() as cursor:
+        for group in groups:
+            if group == []:
+                continue
+            where, params = '', []
+            if group is not None:
+                where = f" AND {column} IN ({', '.join(['%s'] * len(group))})"
+                params = group
+
+            if using.vendor == 'postgresql':
+                config = search_config()
+                cursor.execute(
+                    f"UPDATE {certificates} AS c SET search_vector = "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce(c.title, '')), 'A') || "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce(c.organization, '')), 'B') || "
+                    f"setweight(to_tsvector('simple', concat_ws(' ', u.first_name, u.last_name, u.username)), 'B') || "
+                    f"setweight(to_tsvector(%s::regconfig, coalesce(c.remarks, '')), 'C') "
+                    f"FROM {users} AS u WHERE u.id = c.student_id{where}",
+                    [config, config, config, *params],
+                )
+            elif using.vendor == 'sqlite':
+                if group is None:
+                    cursor.execute(f'DELETE FROM {FTS_TABLE}')
+                else:
+                    source = f'SELECT c.id FROM {certificates} AS c WHERE 1=1{where}'
+                    cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({source})', params)
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, organization, remarks, student) "
+                    f"SELECT c.id, c.title, c.organization, c.remarks, "
+                    f"u.first_name || ' ' || u.last_name || ' ' || u.username "
+                    f"FROM {certificates} AS c JOIN {users} AS u ON u.id = c.student_id WHERE 1=1{where}",
+                    params,
+                )
+
+
+def remove_from_search_index(ids, using=connection):
+    """PostgreSQL drops the vector with the row; the FTS5 table needs cleaning up."""
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        for group in _chunks(ids):
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(group))})", group
+            )
+
+
+# ───────────────────────── Queries ─────────────────────────
+
+def fts5_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_certificates(queryset, text):
+    """Filter ``queryset`` to certificates matching ``text``, best matches first."""
+    text = text.strip()
+    vendor = connection.vendor
+
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config=search_config(), search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+        ).order_by('-rank', '-created_at')
+
+    if vendor == 'sqlite':
+        match = fts5_query(text)
+        if not match:
+            return queryset.none()
+        certificates, _ = _tables()
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        # bm25() is lower-is-better, so negate it to sort like ts_rank
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {certificates}.id',
+            [match], output_field=FloatField(),
+        )
+        matching = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        return queryset.filter(pk__in=matching).annotate(rank=rank).order_by('-rank', '-created_at')
+
+    condition = Q()
+    for word in text.split():
+        condition &= (
+            Q(title__icontains=word) | Q(organization__icontains=word) | Q(remarks__icontains=word)
+            | Q(student__first_name__icontains=word) | Q(student__last_name__icontains=word)
+            | Q(student__username__icontains=word)
+        )
+    return queryset.filter(condition).order_by('-created_at')
@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from .downloads import download_url
 from .models import Certificate
+from .review import MAX_BULK_REVIEWS
+from .storage import file_digest
+from .uploads import MAX_UPLOAD_SIZE, SIGNATURES, file_extension, matches_signature, read_head, size_error
 from accounts.serializers import UserSerializer
 from datetime import date
 
@@ -8,15 +12,18 @@ class CertificateSerializer(serializers.ModelSerializer):
     """Full certificate details with nested student/faculty info."""
     student_name = serializers.SerializerMethodField()
     faculty_name = serializers.SerializerMethodField()
+    file = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Certificate
         fields = [
             'id', 'student', 'student_name', 'faculty', 'faculty_name',
             'title', 'organization', 'issue_date', 'expiry_date',
-            'file', 'status', 'remarks', 'created_at'
+            'file', 'file_hash', 'thumbnail_url', 'preview_url', 'status', 'remarks', 'created_at'
         ]
-        read_only_fields = ['id', 'student', 'faculty', 'status', 'remarks', 'created_at']
+        read_only_fields = ['id', 'student', 'faculty', 'file_hash', 'status', 'remarks', 'created_at']
 
     def get_student_name(self, obj):
         return f"{obj.student.first_name} {obj.student.last_name}".strip() or obj.student.username
@@ -26,6 +33,15 @@ class CertificateSerializer(serializers.ModelSerializer):
             return f"{obj.faculty.first_name} {obj.faculty.last_name}".strip() or obj.faculty.username
         return "Not assigned"
 
+    def get_file(self, obj):
+        return download_url(obj, 'file', self.context.get('request'))
+
+    def get_thumbnail_url(self, obj):
+        return download_url(obj, 'thumbnail', self.context.get('request'))
+
+    def get_preview_url(self, obj):
+        return download_url(obj, 'preview', self.context.get('request'))
+
 
 class CertificateUploadSerializer(serializers.ModelSerializer):
     """Serializer for uploading a new certificate."""
@@ -35,14 +51,16 @@ class CertificateUploadSerializer(serializers.ModelSerializer):
         fields = ['title', 'organization', 'issue_date', 'expiry_date', 'file']
 
     def validate_file(self, value):
-        allowed_extensions = ['pdf', 'jpg', 'jpeg', 'png']
-        ext = value.name.split('.')[-1].lower()
-        if ext not in allowed_extensions:
+        ext = file_extension(value.name)
+        if ext not in SIGNATURES:
             raise serializers.ValidationError(
-                f"Unsupported file type '.{ext}'. Allowed: {', '.join(allowed_extensions)}"
+                f"Unsupported file type '.{ext}'. Allowed: {', '.join(SIGNATURES)}"
             )
-        if value.size > 10 * 1024 * 1024:  # 10MB limit
-            raise serializers.ValidationError("File size must be under 10MB.")
+        if value.size > MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(size_error(MAX_UPLOAD_SIZE))
+        if not matches_signature(ext, read_head(value)):
+            raise serializers.ValidationError(f"File content is not a valid {ext.upper()}.")
+        file_digest(value)
         return value
 
     def validate_expiry_date(self, value):
@@ -62,10 +80,72 @@ class CertificateUploadSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 'expiry_date': "Expiry date must be after the issue date."
             })
+        self.reject_duplicate(data)
         return data
 
+    def reject_duplicate(self, data):
+        """Refuse a file this student has already submitted, before it reaches a faculty queue."""
+        student = data.get('student') or self.context.get('student')
+        upload = data.get('file')
+        if student and upload and Certificate.objects.filter(
+            file_hash=file_digest(upload), student=student
+        ).exists():
+            raise serializers.ValidationError({
+                'file': "You have already uploaded this certificate."
+            })
+
+    def create(self, validated_data):
+        validated_data['file_hash'] = file_digest(validated_data['file'])
+        return super().create(validated_data)
+
 
 class CertificateReviewSerializer(serializers.Serializer):
     """Serializer for faculty reviewing (accept/reject) a certificate."""
     status = serializers.ChoiceField(choices=['accepted', 'rejected'])
     remarks = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BulkReviewItemSerializer(CertificateReviewSerializer):
+    id = serializers.IntegerField()
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """A list of ``{id, status, remarks}`` reviews applied in one transaction."""
+    reviews = BulkReviewItemSerializer(many=True, allow_empty=False, max_length=MAX_BULK_REVIEWS)
+
+    def validate_reviews(self, value):
+        ids = [review['id'] for review in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each certificate may only appear once.")
+        return value
+
+
+class CertificateImportSerializer(CertificateUploadSerializer):
+    """
+    Validates one manifest row of a bulk import with the upload rules.
+    Students and faculty are given by username and resolved from the
+    ``users`` dict in the serializer context.
+    """
+    student = serializers.CharField()
+    faculty = serializers.CharField(required=False, allow_blank=True, default='')
+
+    class Meta(CertificateUploadSerializer.Meta):
+        fields = CertificateUploadSerializer.Meta.fields + ['student', 'faculty', 'status', 'remarks']
+
+    def _resolve(self, username, role):
+        user = self.context['users'].get(username)
+        if user is None or user.role != role:
+            raise serializers.ValidationError(f"No {role} with username '{username}'.")
+        return user
+
+    def validate_student(self, value):
+        return self._resolve(value, 'student')
+
+    def validate_faculty(self, value):
+        return self._resolve(value, 'faculty') if value else None
+
+    def validate_expiry_date(self, value):
+        """Historical imports may include expired certificates when allowed."""
+        if self.context.get('allow_expired'):
+            return value
+        return super().validate_expiry_date(value)
@@ -0,0 +1,120 @@
+"""
+Signal handlers that keep denormalized certificate data in step.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from .analytics import (
+    TRACKED_FIELDS, certificate_keys, instance_values,
+    record_certificate_change, record_user_change,
+)
+from .assignment import ensure_faculty_load, release_faculty
+from .blobs import acquire_files, release_file
+from .caching import bump_all, bump_versions
+from .models import AnalyticsCounter, Certificate
+from .search import remove_from_search_index, update_search_index
+from .storage import file_digest
+from .tasks import queue_previews
+
+
+# Certificate columns that feed the search index
+SEARCH_FIELDS = {'title', 'organization', 'remarks', 'student', 'student_id'}
+
+# User columns shown on other users' dashboards and in the search index
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+# ───────────────────────── Users ─────────────────────────
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_previous_user(sender, instance, update_fields=None, **kwargs):
+    instance._previous_user = None
+    fields = [f for f in ('role', *NAME_FIELDS) if update_fields is None or f in update_fields]
+    if instance._state.adding or not fields:
+        return
+    instance._previous_user = CustomUser.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Every faculty member gets a load row; role changes move the user counters."""
+    ensure_faculty_load(instance)
+    if created:
+        record_user_change(new_role=instance.role)
+        return
+    previous = getattr(instance, '_previous_user', None) or {}
+    changed = {field for field, value in previous.items() if value != getattr(instance, field)}
+    if 'role' in changed:
+        record_user_change(old_role=previous['role'], new_role=instance.role)
+    if changed:
+        bump_all()
+    # Names show up in the search index
+    if instance.role == 'student' and changed & set(NAME_FIELDS):
+        update_search_index(student_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    record_user_change(old_role=instance.role)
+    # Their certificates were detached with SET_NULL, which sends no signals.
+    AnalyticsCounter.objects.filter(scope='faculty', key=str(instance.pk)).delete()
+    bump_all()
+
+
+# ───────────────────────── Certificates ─────────────────────────
+
+@receiver(pre_save, sender=Certificate)
+def hash_new_file(sender, instance, **kwargs):
+    """Fill file_hash for certificates created outside the upload serializer."""
+    if instance._state.adding and not instance.file_hash and instance.file and not instance.file._committed:
+        instance.file_hash = file_digest(instance.file.file)
+
+
+@receiver(pre_save, sender=Certificate)
+def remember_previous_certificate(sender, instance, **kwargs):
+    instance._previous_keys = None
+    if instance._state.adding:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if not all(field in loaded for field in TRACKED_FIELDS):
+        loaded = Certificate.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    if loaded:
+        instance._previous_keys = certificate_keys(loaded)
+
+
+@receiver(post_save, sender=Certificate)
+def certificate_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        acquire_files([instance])
+        queue_previews([instance])
+    if created or update_fields is None or SEARCH_FIELDS & set(update_fields):
+        update_search_index(ids=[instance.pk])
+    values = instance_values(instance)
+    loaded = getattr(instance, '_loaded_values', {})
+    if update_fields is not None:
+        # Fields outside update_fields were not written; keep their DB values.
+        values.update({
+            field: loaded[field] for field in TRACKED_FIELDS
+            if field in loaded and field not in update_fields
+            and field.removesuffix('_id') not in update_fields
+        })
+    new_keys = certificate_keys(values)
+    previous = getattr(instance, '_previous_keys', None)
+    if previous != new_keys:
+        record_certificate_change(old=previous, new=new_keys)
+    bump_versions({instance.student_id, instance.faculty_id, loaded.get('faculty_id')})
+    instance._loaded_values = {**loaded, **values}
+
+
+@receiver(post_delete, sender=Certificate)
+def certificate_deleted(sender, instance, **kwargs):
+    """Deleting a pending certificate frees its faculty slot and file reference."""
+    if instance.status == 'pending':
+        release_faculty(instance.faculty_id)
+    release_file(instance.file_hash)
+    remove_from_search_index([instance.pk])
+    record_certificate_change(old=certificate_keys(instance_values(instance)))
+    bump_versions({instance.student_id, instance.faculty_id})
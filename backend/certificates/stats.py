@@ -0,0 +1,53 @@
+"""
+Certificate statistics shared by the dashboard and analytics endpoints.
+
+Every status breakdown is computed with a single conditional-aggregation
+query per scope. System-wide counts live in the analytics rollup.
+
+The performance score is pluggable through settings:
+
+    CERTIFICATE_SCORE_FUNCTION = 'myapp.scoring.weighted_score'
+
+The function receives the status breakdown dict and returns a number.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils.module_loading import import_string
+
+from .models import Certificate
+
+
+STATUSES = [choice for choice, _ in Certificate.STATUS_CHOICES]
+
+
+def status_breakdown(queryset):
+    """
+    Returns {'total', 'pending', 'accepted', 'rejected'} for a certificate
+    queryset in one query.
+    """
+    counts = {s: Count('id', filter=Q(status=s)) for s in STATUSES}
+    return queryset.aggregate(total=Count('id'), **counts)
+
+
+def default_score(breakdown):
+    """Performance Score = (Accepted * 10) - (Rejected * 2)"""
+    return (breakdown['accepted'] * 10) - (breakdown['rejected'] * 2)
+
+
+def get_score_function():
+    path = getattr(settings, 'CERTIFICATE_SCORE_FUNCTION', None)
+    return import_string(path) if path else default_score
+
+
+# ───────────────────────── Scopes ─────────────────────────
+
+def student_stats(student):
+    """Status breakdown plus performance score for one student."""
+    breakdown = status_breakdown(Certificate.objects.filter(student=student))
+    return {'score': get_score_function()(breakdown), **breakdown}
+
+
+def faculty_stats(faculty):
+    """Status breakdown of the certificates assigned to one faculty member."""
+    return status_breakdown(Certificate.objects.filter(faculty=faculty))
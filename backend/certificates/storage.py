@@ -0,0 +1,81 @@
+"""
+Content-addressed storage for certificate files.
+
+Uploads are stored once under their SHA-256 digest, e.g.
+``certificates/3f/3fa9…e1.pdf``, so identical files share a single blob.
+Reference counts live in the ``StoredFile`` table (see blobs.py). Before
+an existing blob is reused, ``pin_file`` restarts its grace period and its
+mtime is touched, so garbage collection cannot delete it between the save
+and the post_save hook that takes the reference.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+def file_digest(content):
+    """
+    SHA-256 hex digest of a Django File, computed chunk by chunk. The result
+    is cached on the object as ``sha256`` so later steps do not re-read it.
+    """
+    digest = getattr(content, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        digest = content.sha256 = hasher.hexdigest()
+        content.seek(0)
+    return digest
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names every file after its content digest."""
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save, so never rename here.
+        return name
+
+    def _save(self, name, content):
+        digest = file_digest(content)
+        ext = os.path.splitext(name)[1].lower()
+        name = f"{os.path.dirname(name)}/{digest[:2]}/{digest}{ext}".lstrip('/')
+        if self._reuse(name, digest):
+            return name
+
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename, so concurrent uploads of the same
+        # content never observe a partial blob.
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    out.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def _reuse(self, name, digest):
+        """Claim an existing blob for this save; False if there is none (any more)."""
+        from .blobs import pin_file   # blobs imports models, which import this module
+        pin_file(digest)
+        try:
+            # Fails if GC removed the blob meanwhile; the fresh mtime protects
+            # it from the orphan sweep until the reference is taken
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def certificate_storage():
+    return ContentAddressedStorage()
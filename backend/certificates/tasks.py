@@ -0,0 +1,26 @@
+"""
+Background tasks for the certificates app.
+"""
+
+import logging
+
+from jobs.queue import enqueue, task
+from .previews import PreviewError, build_previews
+
+
+logger = logging.getLogger(__name__)
+
+
+@task('certificates.build_previews')
+def build_certificate_previews(digest):
+    """Render WebP previews for one stored file; unrenderable files are skipped, not retried."""
+    try:
+        build_previews(digest)
+    except PreviewError as e:
+        logger.warning(f"No preview for file {digest}: {e}")
+
+
+def queue_previews(certs):
+    """Queue one preview job per distinct file among ``certs``."""
+    for digest in {cert.file_hash for cert in certs if cert.file_hash}:
+        enqueue('certificates.build_previews', digest=digest)
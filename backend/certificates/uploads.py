@@ -0,0 +1,121 @@
+"""
+Streaming validation of certificate uploads.
+
+``CertificateUploadHandler`` sits in front of Django's usual memory/temp
+file handlers and inspects the upload as it arrives:
+
+- the first bytes must carry a PDF, JPEG or PNG signature matching the
+  file extension, so a renamed executable never reaches disk;
+- the running byte count may not pass ``MAX_UPLOAD_SIZE``.
+
+Either failure raises ``StopUpload(connection_reset=True)``, which stops
+Django reading the request body. The handler keeps the reason in
+``error`` for the view to report, and hashes the file while streaming so
+``file_digest`` never has to re-read it.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    FileUploadHandler, MemoryFileUploadHandler, StopFutureHandlers, StopUpload,
+    TemporaryFileUploadHandler,
+)
+
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# extension -> accepted leading bytes
+SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'jpg': (b'\xff\xd8\xff',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+}
+
+# Multipart boundaries and the small text fields sent alongside the file
+FORM_OVERHEAD = 64 * 1024
+
+
+def size_error(max_size):
+    """The "too large" message for a limit, e.g. 'File size must be under 10MB.'"""
+    for unit, size in (('MB', 1024 * 1024), ('KB', 1024)):
+        if max_size >= size:
+            return f'File size must be under {max_size / size:g}{unit}.'
+    return f'File size must be under {max_size} bytes.'
+
+
+def file_extension(name):
+    return name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+
+
+def matches_signature(extension, head):
+    return any(head.startswith(signature) for signature in SIGNATURES.get(extension, ()))
+
+
+def read_head(fileobj, size=16):
+    """First bytes of a Django File, leaving its position at the start."""
+    fileobj.seek(0)
+    head = fileobj.read(size)
+    fileobj.seek(0)
+    return head
+
+
+class CertificateUploadHandler(FileUploadHandler):
+    """Reject bad uploads while streaming, then hand bytes to the stock handlers."""
+
+    def __init__(self, request=None, max_size=MAX_UPLOAD_SIZE):
+        super().__init__(request)
+        self.max_size = max_size
+        self.error = None
+        self.inner = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.content_length = content_length
+        if content_length is not None and content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            self.inner = MemoryFileUploadHandler(self.request)
+        else:
+            self.inner = TemporaryFileUploadHandler(self.request)
+        self.inner.handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def reject(self, message):
+        self.error = message
+        if hasattr(self.inner, 'file'):
+            self.inner.file.close()
+        raise StopUpload(connection_reset=True)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None,
+                 content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        extension = file_extension(file_name)
+        if extension not in SIGNATURES:
+            self.reject(
+                f"Unsupported file type '.{extension}'. Allowed: {', '.join(SIGNATURES)}"
+            )
+        if self.content_length and self.content_length > self.max_size + FORM_OVERHEAD:
+            self.reject(size_error(self.max_size))
+        self.extension = extension
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        try:
+            self.inner.new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        except StopFutureHandlers:
+            pass  # there are no further handlers; the memory handler just claims the file
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not matches_signature(self.extension, raw_data):
+            self.reject(f"File content is not a valid {self.extension.upper()}.")
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.reject(size_error(self.max_size))
+        self.hasher.update(raw_data)
+        return self.inner.receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = self.inner.file_complete(file_size)
+        if upload is not None:
+            upload.sha256 = self.hasher.hexdigest()
+        return upload
+
+    def upload_interrupted(self):
+        self.inner.upload_interrupted()
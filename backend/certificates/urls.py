@@ -7,13 +7,24 @@ urlpatterns = [
     path('my/', views.StudentCertificateListView.as_view(), name='cert-list'),
     path('performance/', views.StudentPerformanceView.as_view(), name='cert-performance'),
     path('alerts/', views.ExpiryAlertView.as_view(), name='cert-alerts'),
+    path('<int:pk>/file/', views.CertificateFileView.as_view(), name='cert-file'),
+
+    # Live updates (SSE)
+    path('events/ticket/', views.CertificateEventTicketView.as_view(), name='cert-events-ticket'),
+    path('events/', views.certificate_events, name='cert-events'),
 
     # Faculty endpoints
     path('assigned/', views.FacultyAssignedView.as_view(), name='cert-assigned'),
     path('review/<int:pk>/', views.FacultyReviewView.as_view(), name='cert-review'),
+    path('review/bulk/', views.FacultyBulkReviewView.as_view(), name='cert-review-bulk'),
     path('faculty-stats/', views.FacultyStatsView.as_view(), name='faculty-stats'),
 
+    # Search (faculty and admin)
+    path('search/', views.CertificateSearchView.as_view(), name='cert-search'),
+
     # Admin endpoints
     path('all/', views.AdminAllCertificatesView.as_view(), name='admin-all-certs'),
     path('analytics/', views.AdminAnalyticsView.as_view(), name='admin-analytics'),
+    path('export/', views.AdminExportView.as_view(), name='admin-export'),
+    path('import/', views.AdminImportView.as_view(), name='admin-import'),
 ]
@@ -1,28 +1,33 @@
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count, Q
-from accounts.models import CustomUser
+from django.db.models import Case, IntegerField, Value, When
 from .models import Certificate
+from .stats import student_stats
 
 
-def assign_faculty():
+# Expiry alert thresholds in days, tightest first (🔴 ≤7, 🟡 ≤15, 🟢 ≤30).
+ALERT_BUCKETS = (7, 15, 30)
+
+
+def alert_bucket_expression(today):
     """
-    Faculty rotation logic:
-    - Each faculty can handle a max of 5 pending certificate assignments.
-    - Returns the first available faculty, or None if all are full.
+    SQL expression mapping expiry_date to the tightest alert bucket it falls
+    in, for certificates expiring within the widest bucket.
     """
-    faculty_members = CustomUser.objects.filter(role='faculty', is_active=True).annotate(
-        pending_count=Count(
-            'assigned_certificates',
-            filter=Q(assigned_certificates__status='pending')
-        )
-    ).order_by('pending_count')
+    *tighter, widest = ALERT_BUCKETS
+    return Case(
+        *[When(expiry_date__lte=today + timedelta(days=days), then=Value(days)) for days in tighter],
+        default=Value(widest),
+        output_field=IntegerField(),
+    )
 
-    for faculty in faculty_members:
-        if faculty.pending_count < 5:
-            return faculty
 
-    return None
+def alert_bucket(expiry_date, today):
+    """Python counterpart of alert_bucket_expression; None outside the widest bucket."""
+    days_left = (expiry_date - today).days
+    if days_left < 0:
+        return None
+    return next((days for days in ALERT_BUCKETS if days_left <= days), None)
 
 
 def get_expiring_certificates(student):
@@ -41,19 +46,7 @@ def get_expiring_certificates(student):
 
 def calculate_performance(student):
     """
-    Performance Score = (Accepted * 10) - (Rejected * 2)
+    Performance Score — see stats.default_score; the formula is pluggable
+    via the CERTIFICATE_SCORE_FUNCTION setting.
     """
-    certs = Certificate.objects.filter(student=student)
-    accepted = certs.filter(status='accepted').count()
-    rejected = certs.filter(status='rejected').count()
-    pending = certs.filter(status='pending').count()
-    total = certs.count()
-    score = (accepted * 10) - (rejected * 2)
-
-    return {
-        'score': score,
-        'total': total,
-        'accepted': accepted,
-        'rejected': rejected,
-        'pending': pending,
-    }
+    return student_stats(student)
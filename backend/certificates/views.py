@@ -1,34 +1,101 @@
+import zipfile
+from collections import Counter
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count, Q
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.parsers import MultiPartParser
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from accounts.permissions import IsAdmin, IsFaculty, IsFacultyOrAdmin, IsStudent, RolePermissionMixin
 from .models import Certificate
-from .serializers import CertificateSerializer, CertificateUploadSerializer, CertificateReviewSerializer
-from .utils import assign_faculty, get_expiring_certificates, calculate_performance
-from accounts.models import CustomUser
+from .pagination import KeysetPagination
+from .analytics import read_analytics
+from .caching import dashboard_cache
+from .events import event_stream, publish_event, read_ticket, stream_url
+from .downloads import RENDITIONS, has_valid_signature, serve_certificate_file
+from .export import FORMATS, ExportFilterError, export_response, filter_export_queryset
+from .listing import FieldsError, certificate_values, format_rows, parse_fields
+from .importer import CertificateImporter, ZipFiles, manifest_format, read_manifest
+from .stats import faculty_stats
+from .review import review_certificates
+from .search import DEFAULT_LIMIT, MAX_LIMIT, search_certificates
+from .serializers import (
+    BulkReviewSerializer, CertificateSerializer, CertificateUploadSerializer, CertificateReviewSerializer,
+)
+from .assignment import claim_faculty, release_faculty
+from .uploads import CertificateUploadHandler
+from .utils import get_expiring_certificates, calculate_performance
+
+
+class CertificateScopeMixin(RolePermissionMixin):
+    """
+    ``get_queryset()`` is the one place certificate views get their rows
+    from: scoped to what the requesting user may see (students their own,
+    faculty their assigned, admins all), with student/faculty joined and
+    only the columns the serializer reads.
+    """
+
+    def get_queryset(self):
+        return Certificate.objects.visible_to(self.request.user).with_people()
+
+
+def list_fields(request):
+    """Output keys for ``?fields=``; raises FieldsError for unknown names."""
+    return parse_fields(request.query_params.get('fields'))
+
+
+def certificate_list_response(request, queryset):
+    """
+    Serialize a certificate list through the fast ``.values()`` path (see
+    listing.py), restricted to ``?fields=`` and paginated by (created_at, id)
+    keyset when the client passes ``cursor`` or ``page_size``.
+    """
+    try:
+        fields = list_fields(request)
+    except FieldsError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = certificate_values(queryset, fields)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(rows, request)
+    if page is None:
+        return Response(format_rows(rows, fields))
+    return paginator.get_paginated_response(format_rows(page, fields))
 
 
 # ───────────────────────── Student Views ─────────────────────────
 
-class CertificateUploadView(APIView):
-    """Student uploads a new certificate. Faculty is auto-assigned."""
-    permission_classes = [permissions.IsAuthenticated]
+class CertificateUploadView(RolePermissionMixin, APIView):
+    """
+    Student uploads a new certificate. Faculty is auto-assigned.
+    The body is checked while it streams in, see uploads.py.
+    """
+    permission_classes = [IsStudent]
+    permission_message = 'Only students can upload certificates.'
+
+    def initialize_request(self, request, *args, **kwargs):
+        self.upload_guard = CertificateUploadHandler(request)
+        request.upload_handlers = [self.upload_guard]
+        return super().initialize_request(request, *args, **kwargs)
 
     def post(self, request):
-        if request.user.role != 'student':
-            return Response({'error': 'Only students can upload certificates.'},
-                            status=status.HTTP_403_FORBIDDEN)
+        data = request.data
+        if self.upload_guard.error:
+            return Response({'file': [self.upload_guard.error]}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = CertificateUploadSerializer(data=request.data)
+        serializer = CertificateUploadSerializer(data=data, context={'student': request.user})
         if serializer.is_valid():
-            # Faculty rotation
-            faculty = assign_faculty()
-            if faculty is None:
-                return Response({
-                    'error': 'No faculty available currently. Please try again later.'
-                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-            cert = serializer.save(student=request.user, faculty=faculty)
+            with transaction.atomic():
+                # Faculty rotation — claims a pending slot on the faculty member
+                faculty = claim_faculty(serializer.validated_data['organization'])
+                if faculty is None:
+                    return Response({
+                        'error': 'No faculty available currently. Please try again later.'
+                    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+                cert = serializer.save(student=request.user, faculty=faculty)
+                publish_event([faculty.pk], 'certificate.assigned', certificate=cert.pk, title=cert.title)
             return Response({
                 'message': 'Certificate uploaded successfully.',
                 'certificate': CertificateSerializer(cert).data
@@ -36,146 +103,276 @@ class CertificateUploadView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class StudentCertificateListView(APIView):
-    """Student views their own certificates."""
-    permission_classes = [permissions.IsAuthenticated]
+class StudentCertificateListView(CertificateScopeMixin, APIView):
+    """Student views their own certificates. Supports ?cursor= / ?page_size= pagination and ?fields=."""
+    permission_classes = [IsStudent]
 
+    @dashboard_cache
     def get(self, request):
-        if request.user.role != 'student':
-            return Response({'error': 'Student access required.'}, status=status.HTTP_403_FORBIDDEN)
-
-        certs = Certificate.objects.filter(student=request.user)
-        serializer = CertificateSerializer(certs, many=True)
-        return Response(serializer.data)
+        return certificate_list_response(request, self.get_queryset())
 
 
-class StudentPerformanceView(APIView):
+class StudentPerformanceView(RolePermissionMixin, APIView):
     """Returns performance metrics for the current student."""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [IsStudent]
 
+    @dashboard_cache
     def get(self, request):
-        if request.user.role != 'student':
-            return Response({'error': 'Student access required.'}, status=status.HTTP_403_FORBIDDEN)
-
         performance = calculate_performance(request.user)
         return Response(performance)
 
 
-class ExpiryAlertView(APIView):
-    """Returns certificates expiring within 30 days."""
-    permission_classes = [permissions.IsAuthenticated]
+class ExpiryAlertView(RolePermissionMixin, APIView):
+    """Returns certificates expiring within 30 days. Supports ?fields=."""
+    permission_classes = [IsStudent]
 
+    @dashboard_cache
     def get(self, request):
-        if request.user.role != 'student':
-            return Response({'error': 'Student access required.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            fields = list_fields(request)
+        except FieldsError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        expiring = get_expiring_certificates(request.user)
-        serializer = CertificateSerializer(expiring, many=True)
+        expiring = format_rows(certificate_values(get_expiring_certificates(request.user), fields), fields)
         return Response({
-            'count': expiring.count(),
-            'expiring_certificates': serializer.data
+            'count': len(expiring),
+            'expiring_certificates': expiring
         })
 
 
-# ───────────────────────── Faculty Views ─────────────────────────
+class CertificateFileView(APIView):
+    """
+    Downloads a certificate file or one of its previews (?rendition=thumbnail|preview).
+    Open to the owning student, the assigned faculty and admins, or to anyone
+    holding a signed link from the certificate serializer.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The response is the file itself, whatever the client accepts
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, pk):
+        rendition = request.query_params.get('rendition', 'file')
+        if rendition not in RENDITIONS:
+            return Response({'error': f"Unknown rendition '{rendition}'."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        certs = Certificate.objects.only('id', 'file', 'file_hash', 'thumbnail', 'preview')
+        if not has_valid_signature(request.query_params, pk, rendition):
+            if not request.user.is_authenticated:
+                raise NotAuthenticated()
+            certs = certs.visible_to(request.user)
+
+        cert = certs.filter(pk=pk).first()
+        if cert is None or not getattr(cert, rendition):
+            return Response({'error': 'Certificate file not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_certificate_file(request, cert, rendition)
 
-class FacultyAssignedView(APIView):
-    """Faculty views their assigned certificates."""
+
+class CertificateEventTicketView(APIView):
+    """Returns a signed URL for the event stream, since EventSource cannot send the token."""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        if request.user.role != 'faculty':
-            return Response({'error': 'Faculty access required.'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'url': stream_url(request, request.user)})
+
+
+async def certificate_events(request):
+    """
+    SSE stream of review and assignment events for the ticket's user.
+    Served by the ASGI events process; under WSGI it would hold a worker per client.
+    """
+    user_id = read_ticket(request.GET.get('ticket'))
+    if user_id is None:
+        return JsonResponse({'error': 'Invalid or expired ticket.'}, status=status.HTTP_401_UNAUTHORIZED)
+    response = StreamingHttpResponse(event_stream(user_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
-        certs = Certificate.objects.filter(faculty=request.user)
-        serializer = CertificateSerializer(certs, many=True)
-        return Response(serializer.data)
+# ───────────────────────── Faculty Views ─────────────────────────
+
+class FacultyAssignedView(CertificateScopeMixin, APIView):
+    """Faculty views their assigned certificates. Supports ?cursor= / ?page_size= pagination and ?fields=."""
+    permission_classes = [IsFaculty]
+
+    @dashboard_cache
+    def get(self, request):
+        return certificate_list_response(request, self.get_queryset())
 
 
-class FacultyReviewView(APIView):
+class FacultyReviewView(CertificateScopeMixin, APIView):
     """Faculty accepts or rejects a certificate with remarks."""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [IsFaculty]
 
     def put(self, request, pk):
-        if request.user.role != 'faculty':
-            return Response({'error': 'Faculty access required.'}, status=status.HTTP_403_FORBIDDEN)
+        with transaction.atomic():
+            try:
+                # Lock only the certificate row, not the joined users
+                cert = self.get_queryset().select_for_update(of=('self',)).get(pk=pk)
+            except Certificate.DoesNotExist:
+                return Response({'error': 'Certificate not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+            serializer = CertificateReviewSerializer(data=request.data)
+            if serializer.is_valid():
+                # Leaving 'pending' frees the faculty member's assignment slot
+                if cert.status == 'pending':
+                    release_faculty(cert.faculty_id)
+                cert.status = serializer.validated_data['status']
+                cert.remarks = serializer.validated_data.get('remarks', '')
+                cert.save(update_fields=['status', 'remarks'])
+                publish_event([cert.student_id, cert.faculty_id], 'certificate.reviewed',
+                              certificate=cert.pk, status=cert.status)
+                return Response({
+                    'message': f'Certificate {cert.status}.',
+                    'certificate': CertificateSerializer(cert).data
+                })
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            cert = Certificate.objects.get(pk=pk, faculty=request.user)
-        except Certificate.DoesNotExist:
-            return Response({'error': 'Certificate not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = CertificateReviewSerializer(data=request.data)
-        if serializer.is_valid():
-            cert.status = serializer.validated_data['status']
-            cert.remarks = serializer.validated_data.get('remarks', '')
-            cert.save()
-            return Response({
-                'message': f'Certificate {cert.status}.',
-                'certificate': CertificateSerializer(cert).data
-            })
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+class FacultyBulkReviewView(RolePermissionMixin, APIView):
+    """
+    Faculty accepts or rejects many certificates at once:
+    ``{"reviews": [{"id": 1, "status": "accepted", "remarks": ""}, ...]}``.
+    Ids that are not assigned to the caller are reported in ``not_found``.
+    """
+    permission_classes = [IsFaculty]
+
+    def post(self, request):
+        serializer = BulkReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        reviewed, not_found = review_certificates(request.user, serializer.validated_data['reviews'])
+        counts = Counter(cert.status for cert in reviewed)
+        return Response({
+            'reviewed': len(reviewed),
+            'accepted': counts['accepted'],
+            'rejected': counts['rejected'],
+            'not_found': not_found,
+        })
 
 
-class FacultyStatsView(APIView):
+class FacultyStatsView(RolePermissionMixin, APIView):
     """Faculty views their review statistics."""
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [IsFaculty]
 
+    @dashboard_cache
     def get(self, request):
-        if request.user.role != 'faculty':
-            return Response({'error': 'Faculty access required.'}, status=status.HTTP_403_FORBIDDEN)
+        stats = faculty_stats(request.user)
+        return Response({
+            'total_assigned': stats['total'],
+            'pending': stats['pending'],
+            'accepted': stats['accepted'],
+            'rejected': stats['rejected'],
+        })
+
+
+# ───────────────────────── Search ─────────────────────────
+
+class CertificateSearchView(CertificateScopeMixin, APIView):
+    """
+    Faculty and admins search certificate title, organization, remarks and
+    student name: ``?q=`` plus the export filters (status, organization,
+    faculty, date_from, date_to) and ``?limit=`` (default 50, max 200).
+    Faculty only see their assigned certificates. Best matches come first.
+    Supports ?fields= like the list endpoints.
+    """
+    permission_classes = [IsFacultyOrAdmin]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = request.query_params.get('limit', '')
+        if limit and not limit.isdigit():
+            return Response({'error': 'limit must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(int(limit or DEFAULT_LIMIT), MAX_LIMIT) or DEFAULT_LIMIT
 
-        certs = Certificate.objects.filter(faculty=request.user)
+        try:
+            fields = list_fields(request)
+            certs = filter_export_queryset(request.query_params, self.get_queryset())
+        except (FieldsError, ExportFilterError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = format_rows(certificate_values(search_certificates(certs, query), fields)[:limit], fields)
         return Response({
-            'total_assigned': certs.count(),
-            'pending': certs.filter(status='pending').count(),
-            'accepted': certs.filter(status='accepted').count(),
-            'rejected': certs.filter(status='rejected').count(),
+            'count': len(results),
+            'results': results,
         })
 
 
 # ───────────────────────── Admin Views ─────────────────────────
 
-class AdminAllCertificatesView(APIView):
-    """Admin views all certificates in the system."""
-    permission_classes = [permissions.IsAuthenticated]
+class AdminAllCertificatesView(CertificateScopeMixin, APIView):
+    """Admin views all certificates in the system. Supports ?cursor= / ?page_size= pagination and ?fields=."""
+    permission_classes = [IsAdmin]
 
     def get(self, request):
-        if request.user.role != 'admin':
-            return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
+        return certificate_list_response(request, self.get_queryset())
 
-        certs = Certificate.objects.all()
-        serializer = CertificateSerializer(certs, many=True)
-        return Response(serializer.data)
 
+class AdminExportView(RolePermissionMixin, APIView):
+    """Admin streams a CSV or NDJSON export of certificates, with optional filters."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in FORMATS:
+            return Response({'error': f"output must be one of: {', '.join(FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            certs = filter_export_queryset(request.query_params)
+        except ExportFilterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return export_response(certs, output)
 
-class AdminAnalyticsView(APIView):
-    """Admin views system-wide analytics."""
-    permission_classes = [permissions.IsAuthenticated]
+
+class AdminImportView(RolePermissionMixin, APIView):
+    """
+    Admin bulk-imports certificates from a CSV/NDJSON `manifest` and a zip
+    `archive` of the files. Large imports should use the import_certificates
+    command instead of a single request.
+    """
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        manifest = request.FILES.get('manifest')
+        archive = request.FILES.get('archive')
+        if not manifest or not archive:
+            return Response({'error': 'Both manifest and archive files are required.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            files = ZipFiles(archive)
+        except zipfile.BadZipFile:
+            return Response({'error': 'archive must be a zip file.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = CertificateImporter(
+            files,
+            allow_expired=request.data.get('reject_expired') not in ('1', 'true'),
+            dry_run=request.data.get('dry_run') in ('1', 'true'),
+        )
+        result = importer.run(read_manifest(manifest.file, manifest_format(manifest.name)))
+        if result.manifest_error and not result.rows:
+            return Response({'error': result.manifest_error}, status=status.HTTP_400_BAD_REQUEST)
+        # Rows read before an unreadable part are committed; report them with the error
+        return Response(result.as_dict())
+
+
+class AdminAnalyticsView(RolePermissionMixin, APIView):
+    """Admin views system-wide analytics. Supports ?days=N and ?organizations=1."""
+    permission_classes = [IsAdmin]
 
     def get(self, request):
-        if request.user.role != 'admin':
-            return Response({'error': 'Admin access required.'}, status=status.HTTP_403_FORBIDDEN)
-
-        total_certs = Certificate.objects.count()
-        certs_by_status = {
-            'pending': Certificate.objects.filter(status='pending').count(),
-            'accepted': Certificate.objects.filter(status='accepted').count(),
-            'rejected': Certificate.objects.filter(status='rejected').count(),
-        }
-        total_students = CustomUser.objects.filter(role='student').count()
-        total_faculty = CustomUser.objects.filter(role='faculty').count()
-
-        # Per-faculty workload
-        faculty_workload = CustomUser.objects.filter(role='faculty').annotate(
-            pending_count=Count('assigned_certificates', filter=Q(assigned_certificates__status='pending')),
-            total_assigned=Count('assigned_certificates'),
-        ).values('id', 'username', 'first_name', 'last_name', 'pending_count', 'total_assigned')
+        try:
+            days = max(0, min(int(request.query_params.get('days', 0)), 366))
+        except ValueError:
+            return Response({'error': 'days must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        organizations = request.query_params.get('organizations') in ('1', 'true')
 
-        return Response({
-            'total_certificates': total_certs,
-            'certificates_by_status': certs_by_status,
-            'total_students': total_students,
-            'total_faculty': total_faculty,
-            'faculty_workload': list(faculty_workload),
-        })
+        return Response(read_analytics(days=days, organizations=organizations))
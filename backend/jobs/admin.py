@@ -0,0 +1,14 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'run_at', 'locked_by', 'created_at']
+    list_filter = ['status', 'task']
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected jobs')
+    def requeue(self, request, queryset):
+        queryset.update(status='queued', attempts=0, run_at=timezone.now(), locked_at=None)
@@ -0,0 +1,58 @@
+"""
+Management command to run background jobs from the database queue.
+
+Usage:
+    python manage.py run_worker                 # Run until stopped
+    python manage.py run_worker --once          # Drain due jobs once and exit
+    python manage.py run_worker --batch 20 --sleep 2
+"""
+
+import signal
+import time
+from django.core.management.base import BaseCommand
+from jobs.queue import run_pending, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Claim and run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every due job once, then exit',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=10,
+            help='Jobs claimed per round trip (default: 10)',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        name = worker_name()
+        self.stdout.write(f'👷 Worker {name} started.')
+        total_ok = total_failed = 0
+
+        while not self.stopping:
+            succeeded, failed = run_pending(options['batch'], name)
+            total_ok += succeeded
+            total_failed += failed
+            if succeeded or failed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Worker stopped. {total_ok} job(s) done, {total_failed} failed.'
+        ))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,173 @@
+"""
+Lightweight database-backed job queue.
+
+Register a function as a task and enqueue it with JSON-serializable kwargs:
+
+    from jobs.queue import task, enqueue
+
+    @task('accounts.send_email')
+    def deliver_email(subject, message, to_email):
+        ...
+
+    enqueue('accounts.send_email', subject=..., message=..., to_email=...)
+
+`manage.py run_worker` claims queued jobs with SELECT … FOR UPDATE SKIP
+LOCKED, so any number of workers can share the table without a broker.
+Failed jobs are retried with exponential backoff and moved to the 'dead'
+state once they run out of attempts.
+
+Settings (all optional):
+
+    JOBS = {
+        'EAGER': False,          # run jobs inline on commit instead of queueing
+        'MAX_ATTEMPTS': 5,
+        'BACKOFF_SECONDS': 30,   # first retry delay, doubled per attempt
+        'LOCK_TIMEOUT': 300,     # seconds before a crashed worker's job is reclaimed
+    }
+
+There is no heartbeat: a job still running after LOCK_TIMEOUT is assumed
+lost and handed to another worker, so LOCK_TIMEOUT must exceed the longest
+task's run time. Each reclaim uses up one of the job's attempts.
+"""
+
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EAGER': False,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'LOCK_TIMEOUT': 300,
+}
+
+_registry = {}
+
+
+def get_config(key):
+    return getattr(settings, 'JOBS', {}).get(key, DEFAULTS[key])
+
+
+def task(name):
+    """Register a function under ``name`` so workers can run it."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"No task registered as '{name}'.")
+
+
+def enqueue(name, run_at=None, max_attempts=None, **payload):
+    """
+    Queue a task. In eager mode the task runs in-process once the current
+    transaction commits.
+    """
+    get_task(name)
+    if get_config('EAGER'):
+        transaction.on_commit(lambda: get_task(name)(**payload))
+        return None
+    return Job.objects.create(
+        task=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or get_config('MAX_ATTEMPTS'),
+    )
+
+
+# ───────────────────────── Worker side ─────────────────────────
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_jobs(limit=10, worker=None):
+    """
+    Atomically mark up to ``limit`` due jobs as running and return them.
+
+    An attempt is counted when the job is claimed, not when it finishes, so
+    a job that keeps crashing its worker still runs out of attempts. Jobs
+    left 'running' past LOCK_TIMEOUT by a crashed worker are reclaimed as
+    their next attempt, or moved to 'dead' if they have none left.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=get_config('LOCK_TIMEOUT'))
+    due = Q(status='queued', run_at__lte=now) | Q(status='running', locked_at__lt=stale)
+
+    with transaction.atomic():
+        query = Job.objects.filter(due).order_by('run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            query = query.select_for_update(skip_locked=True)
+        rows = list(query.values_list('id', 'status', 'attempts', 'max_attempts')[:limit])
+        if not rows:
+            return []
+
+        exhausted = [pk for pk, state, attempts, max_attempts in rows
+                     if state == 'running' and attempts >= max_attempts]
+        if exhausted:
+            logger.error(f"Job(s) {exhausted} lost their worker on the last attempt; marking dead.")
+            Job.objects.filter(id__in=exhausted).update(
+                status='dead', locked_at=None, finished_at=now,
+                last_error='Worker lost the job (crashed or exceeded LOCK_TIMEOUT) on its last attempt.',
+            )
+
+        ids = [pk for pk, *_ in rows if pk not in exhausted]
+        Job.objects.filter(id__in=ids).update(
+            status='running', locked_at=now, locked_by=worker or worker_name(),
+            attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(id__in=ids).order_by('run_at'))
+
+
+def run_job(job):
+    """Run one claimed job and record the outcome. Returns True on success."""
+    try:
+        get_task(job.task)(**job.payload)
+    except Exception as e:
+        job.last_error = f"{e}\n\n{traceback.format_exc()}"
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            job.finished_at = timezone.now()
+            logger.error(f"Job {job} is dead after {job.attempts} attempt(s): {e}")
+        else:
+            delay = get_config('BACKOFF_SECONDS') * (2 ** (job.attempts - 1))
+            job.status = 'queued'
+            job.run_at = timezone.now() + timedelta(seconds=delay)
+            logger.warning(f"Job {job} failed (attempt {job.attempts}), retrying in {delay}s: {e}")
+        job.locked_at = None
+        job.save(update_fields=['attempts', 'status', 'run_at', 'locked_at', 'last_error', 'finished_at'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=['attempts', 'status', 'locked_at', 'finished_at'])
+    return True
+
+
+def run_pending(limit=10, worker=None):
+    """Claim and run one batch of due jobs. Returns (succeeded, failed)."""
+    succeeded = failed = 0
+    for job in claim_jobs(limit, worker):
+        if run_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.emails import send_welcome_email
+from accounts.models import CustomUser
+from .models import Job
+from .queue import claim_jobs, enqueue, run_pending, task
+
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    """Jobs are claimed once, retried with backoff and dead-lettered."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        enqueue('tests.record', value=42)
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(calls, [42])
+        self.assertEqual(Job.objects.get().status, 'done')
+        self.assertEqual(run_pending(), (0, 0))
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        enqueue('tests.record', value=1)
+        self.assertEqual(len(claim_jobs()), 1)
+        self.assertEqual(claim_jobs(), [])
+
+    def test_stale_running_job_is_reclaimed(self):
+        enqueue('tests.record', value=1)
+        claim_jobs()
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(len(claim_jobs()), 1)
+        self.assertEqual(Job.objects.get().attempts, 2)
+
+    def test_job_that_keeps_crashing_its_worker_dies(self):
+        enqueue('tests.record', value=1, max_attempts=2)
+        for _ in range(2):
+            self.assertEqual(len(claim_jobs()), 1)
+            # The worker dies without recording anything
+            Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertEqual(claim_jobs(), [])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('dead', 2))
+        self.assertEqual(calls, [])
+
+    def test_failure_backs_off_then_dies(self):
+        job = enqueue('tests.explode', max_attempts=2)
+        self.assertEqual(run_pending(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'dead')
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(LookupError):
+            enqueue('tests.missing')
+
+    def test_run_worker_once(self):
+        enqueue('tests.record', value='a')
+        enqueue('tests.record', value='b')
+        call_command('run_worker', '--once', stdout=StringIO())
+        self.assertEqual(calls, ['a', 'b'])
+
+
+class EmailJobTests(TestCase):
+    """Email helpers queue instead of sending inside the request."""
+
+    def test_email_is_queued_then_sent_by_worker(self):
+        user = CustomUser.objects.create_user(username='alice', email='alice@example.com', password='x')
+        send_welcome_email(user)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.get().task, 'accounts.send_email')
+
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['alice@example.com'])
+
+    @override_settings(JOBS={'EAGER': True})
+    def test_eager_mode_sends_on_commit(self):
+        user = CustomUser.objects.create_user(username='bob', email='bob@example.com', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            send_welcome_email(user)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Job.objects.exists())
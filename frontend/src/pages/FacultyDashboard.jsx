@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import CustomCursor from '../components/CustomCursor';
 import API from '../services/api';
+import { subscribeToEvents } from '../services/events';
 
 export default function FacultyDashboard() {
     const { user, logout } = useAuth();
@@ -17,8 +18,11 @@ export default function FacultyDashboard() {
 
     useEffect(() => { fetchData(); }, []);
 
-    const fetchData = async () => {
-        setLoading(true);
+    // Refetch when a certificate of ours is assigned or reviewed instead of polling
+    useEffect(() => subscribeToEvents(() => fetchData({ quiet: true })), []);
+
+    const fetchData = async ({ quiet = false } = {}) => {
+        if (!quiet) setLoading(true);
         try {
             const [certRes, statsRes] = await Promise.all([
                 API.get('/certificates/assigned/'),
@@ -142,6 +146,17 @@ export default function FacultyDashboard() {
                                         {cert.expiry_date && <span>⏰ Expires: {cert.expiry_date}</span>}
                                     </div>
 
+                                    {cert.thumbnail_url && (
+                                        <a href={cert.preview_url || cert.file} target="_blank" rel="noopener noreferrer">
+                                            <img
+                                                src={cert.thumbnail_url}
+                                                alt={cert.title}
+                                                loading="lazy"
+                                                style={{ maxWidth: 320, maxHeight: 240, borderRadius: 8, marginBottom: 12 }}
+                                            />
+                                        </a>
+                                    )}
+
                                     <div className="cert-card-actions">
                                         <a href={cert.file} target="_blank" rel="noopener noreferrer" className="btn btn-secondary btn-sm">
                                             📄 View File
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import CustomCursor from '../components/CustomCursor';
 import API from '../services/api';
+import { subscribeToEvents } from '../services/events';
 
 export default function StudentDashboard() {
     const { user, logout } = useAuth();
@@ -20,8 +21,11 @@ export default function StudentDashboard() {
 
     useEffect(() => { fetchData(); }, []);
 
-    const fetchData = async () => {
-        setLoading(true);
+    // Refetch when a certificate of ours is assigned or reviewed instead of polling
+    useEffect(() => subscribeToEvents(() => fetchData({ quiet: true })), []);
+
+    const fetchData = async ({ quiet = false } = {}) => {
+        if (!quiet) setLoading(true);
         try {
             const [certRes, perfRes, alertRes] = await Promise.all([
                 API.get('/certificates/my/'),
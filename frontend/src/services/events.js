@@ -0,0 +1,45 @@
+import API from './api';
+
+const EVENT_TYPES = ['certificate.assigned', 'certificate.reviewed', 'resync'];
+
+// Subscribe to live certificate events. Returns an unsubscribe function.
+export function subscribeToEvents(onEvent) {
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+    let connectedOnce = false;
+
+    const retry = () => {
+        if (!closed) retryTimer = setTimeout(connect, 5000);
+    };
+
+    const connect = async () => {
+        try {
+            // EventSource cannot send the auth header, so ask for a signed stream URL
+            const { data } = await API.get('/certificates/events/ticket/');
+            if (closed) return;
+            source = new EventSource(data.url);
+            source.addEventListener('ready', () => {
+                // After a reconnect we may have missed events; the first connect follows a fresh fetch
+                if (connectedOnce) onEvent({ type: 'ready' });
+                connectedOnce = true;
+            });
+            EVENT_TYPES.forEach((type) => {
+                source.addEventListener(type, (e) => onEvent(JSON.parse(e.data)));
+            });
+            source.onerror = () => {
+                source.close();
+                retry();
+            };
+        } catch (err) {
+            retry();
+        }
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        if (source) source.close();
+    };
+}